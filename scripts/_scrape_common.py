@@ -0,0 +1,57 @@
+"""
+Helpers shared by the irshad, mgstore and soliton scrapers.
+
+The scrapers run as standalone scripts (python scripts/<site>.py), so this
+module is imported as a sibling from the scripts directory.
+"""
+
+import asyncio
+
+
+class _KeepChars(dict):
+    r"""
+    str.translate table that deletes every character except decimal digits
+    and `extra` — the same set as the regex [^\d...] it replaces, but
+    applied in one C pass. Each code point is classified once, then cached.
+    """
+
+    def __init__(self, extra: str) -> None:
+        super().__init__()
+        self.extra = extra
+
+    def __missing__(self, cp: int) -> int | None:
+        ch = chr(cp)
+        keep = self[cp] = cp if ch.isdecimal() or ch in self.extra else None
+        return keep
+
+
+class RateLimiter:
+    """
+    Token bucket allowing at most `rate` request starts per `period` seconds.
+    Unlike sleeping under the semaphore, it only delays requests that would
+    exceed the rate, so slow responses don't stretch the gap between sends.
+    """
+
+    def __init__(self, rate: int, period: float) -> None:
+        self.rate   = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._last: float | None = None
+        self._lock   = asyncio.Lock()
+
+    async def __aenter__(self) -> "RateLimiter":
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._last is not None:
+                    refill = (now - self._last) * self.rate / self.period
+                    self._tokens = min(self.rate, self._tokens + refill)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+    async def __aexit__(self, *exc) -> None:
+        return None
@@ -14,21 +14,26 @@ Charts produced
 8.  installment_terms.png       — most popular installment terms (birmarket)
 """
 
-import csv
+import os
 import re
-import statistics
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.collections import PolyCollection
 import numpy as np
+import pandas as pd
 
 # ── paths ─────────────────────────────────────────────────────────────────────
 BASE_DIR   = Path(__file__).resolve().parent.parent
 DATA_FILE  = BASE_DIR / "data" / "data.csv"
+CACHE_FILE = BASE_DIR / "data" / ".cache.parquet"
+CACHE_SIG  = BASE_DIR / "data" / ".cache.sig"
+CACHE_ERRORS = (ImportError, OSError, ValueError,   # no engine / unreadable / corrupt
+                NotImplementedError)                # e.g. pyarrow ArrowNotImplementedError
 CHARTS_DIR = BASE_DIR / "charts"
 CHARTS_DIR.mkdir(exist_ok=True)
 
@@ -59,24 +64,125 @@ def style_axes(ax, title: str, xlabel: str = "", ylabel: str = "") -> None:
     ax.set_facecolor(GREY_LIGHT)
     ax.grid(axis="y", color="white", linewidth=0.8)
 
+def new_axes(fig: plt.Figure, figsize: tuple[float, float]) -> plt.Axes:
+    """Resize the shared figure and give it a single fresh Axes."""
+    fig.set_size_inches(*figsize)
+    return fig.add_subplot()
+
 def save(fig: plt.Figure, name: str) -> None:
+    # Dense bar/scatter artists are created with rasterized=True, so a vector
+    # export (.svg/.pdf) embeds them as a bitmap while axes and labels stay
+    # vector. Agg (PNG) rasterizes everything anyway.
     path = CHARTS_DIR / name
-    fig.savefig(path, dpi=150, bbox_inches="tight", facecolor="white")
-    plt.close(fig)
+    # zlib level 1: much faster PNG encoding for a slightly larger file
+    fig.savefig(path, dpi=150, bbox_inches="tight", facecolor="white",
+                pil_kwargs={"compress_level": 1, "optimize": False})
+    fig.clf()
     print(f"  saved → {path.name}")
 
 
 # ── load data ─────────────────────────────────────────────────────────────────
-def load() -> list[dict]:
-    with open(DATA_FILE, newline="", encoding="utf-8") as f:
-        return list(csv.DictReader(f))
+INST_COLS = ["installment_6m", "installment_12m", "installment_18m",
+             "installment_monthly", "installment", "installment_active_price"]
+
+LOAD_COLS = ["source", "name", "price_current", "discount_pct",
+             "installment_term", *INST_COLS]
+
+_PCT_RE    = re.compile(r"([\d.]+)")   # "-16 %" → "16"
+_DIGITS_RE = re.compile(r"\d+")        # "18 ay" → "18"
+
+def parse_csv() -> pd.DataFrame:
+    """Parse data.csv once into typed columns plus reusable row masks."""
+    df = pd.read_csv(
+        DATA_FILE,
+        usecols=LOAD_COLS,
+        dtype={**{c: "string" for c in LOAD_COLS}, "source": "category"},
+        keep_default_na=False,
+        na_values=[""],
+    )
+    # malformed prices (e.g. "1.299.99") become NaN and fail price_valid
+    df["price_current"] = pd.to_numeric(
+        df["price_current"], errors="coerce"
+    ).astype("float32")
+    # prices at or below 1 AZN are placeholders (out of stock / discontinued)
+    df["price_valid"]    = df["price_current"] > 1.0
+    df["is_retail"]      = df["source"].isin(RETAIL_SOURCES_SET)
+    df["is_marketplace"] = df["source"].isin(MARKETPLACE_SOURCES_SET)
+    # "-16 %", "15%", "27" → 16.0, 15.0, 27.0 (NaN when no number present)
+    df["discount_pct_num"] = pd.to_numeric(
+        df["discount_pct"].str.extract(_PCT_RE, expand=False),
+        errors="coerce",
+    ).astype("float32")
+    # any installment column populated (ignoring whitespace)
+    has_inst = np.zeros(len(df), dtype=bool)
+    for c in INST_COLS:
+        has_inst |= df[c].fillna("").str.strip().ne("").to_numpy(dtype=bool)
+    df["has_inst"] = has_inst
+    return df
+
+def cache_signature() -> str:
+    """Changes whenever data.csv or this script (and so load()'s schema) does."""
+    data, script = DATA_FILE.stat(), Path(__file__).stat()
+    return f"{data.st_size}:{data.st_mtime_ns}:{script.st_mtime_ns}"
+
+def load() -> pd.DataFrame:
+    """
+    Return the typed DataFrame, served from a Parquet snapshot when data.csv
+    is unchanged since the last run. The cache is best-effort: a missing
+    Parquet engine (pyarrow / fastparquet), an unreadable or corrupt
+    snapshot, or a failed write all fall back to parsing the CSV.
+    """
+    sig = cache_signature()
+    try:
+        if CACHE_FILE.exists() and CACHE_SIG.exists() and CACHE_SIG.read_text() == sig:
+            return with_source_labels(pd.read_parquet(CACHE_FILE))
+    except CACHE_ERRORS:
+        pass
 
-def valid_price(row: dict) -> float | None:
+    df = parse_csv()
     try:
-        p = float(row["price_current"])
-        return p if p > 1.0 else None
-    except (ValueError, TypeError):
-        return None
+        df.to_parquet(CACHE_FILE, compression="zstd", index=False)
+        CACHE_SIG.write_text(sig)
+    except CACHE_ERRORS:
+        pass
+    return with_source_labels(df)
+
+def with_source_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Attach display labels aligned with source.cat.categories, so charts can
+    look them up as df.attrs["source_labels"][codes]. Kept out of the Parquet
+    cache and rebuilt per load, since it follows SOURCE_LABELS.
+    """
+    df.attrs["source_labels"] = np.array(
+        [SOURCE_LABELS.get(c, c) for c in df["source"].cat.categories],
+        dtype=object,
+    )
+    return df
+
+
+def price_bin_counts(df: pd.DataFrame, bin_edges: list[float]
+                     ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count valid prices per (source, price bin) in a single pass.
+
+    Bins are right-open, [edges[k], edges[k+1]).  Returns (counts, totals):
+    counts has shape (n_sources, n_bins), rows indexed by source category
+    code; totals holds every valid price per source, in range or not.
+    """
+    edges  = np.asarray(bin_edges, dtype=np.float64)
+    n_src  = len(df["source"].cat.categories)
+    n_bins = len(edges) - 1
+
+    valid  = df["price_valid"].to_numpy()
+    codes  = df["source"].cat.codes.to_numpy()[valid].astype(np.intp)
+    bins   = np.searchsorted(edges, df["price_current"].to_numpy()[valid],
+                             side="right") - 1
+    inside = (bins >= 0) & (bins < n_bins)
+
+    counts = np.bincount(codes[inside] * n_bins + bins[inside],
+                         minlength=n_src * n_bins).reshape(n_src, n_bins)
+    totals = np.bincount(codes, minlength=n_src)
+    return counts, totals
 
 
 RETAIL_SOURCES = [
@@ -86,6 +192,15 @@ RETAIL_SOURCES = [
 MARKETPLACE_SOURCES = ["birmarket.az", "tap.az"]
 ALL_SOURCES = RETAIL_SOURCES + MARKETPLACE_SOURCES
 
+# hashed lookups for membership tests; the lists above keep display order
+RETAIL_SOURCES_SET      = frozenset(RETAIL_SOURCES)
+MARKETPLACE_SOURCES_SET = frozenset(MARKETPLACE_SOURCES)
+
+def source_colors(sources: list[str]) -> np.ndarray:
+    """Bar colours: red for marketplaces, blue for retail stores."""
+    return np.where(pd.Index(sources).isin(MARKETPLACE_SOURCES_SET),
+                    ACCENT_RED, BRAND_BLUE)
+
 SOURCE_LABELS = {
     "bakuelectronics.az": "bakuelectronics",
     "birmarket.az":       "birmarket",
@@ -104,24 +219,20 @@ SOURCE_LABELS = {
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 1 — Catalogue Size by Platform
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_catalogue_size(rows: list[dict]) -> None:
-    from collections import Counter
-    counts = Counter(r["source"] for r in rows)
-    items  = sorted(counts.items(), key=lambda x: x[1])
+def chart_catalogue_size(df: pd.DataFrame, fig: plt.Figure) -> None:
+    counts = df["source"].value_counts().sort_values(kind="stable")
 
-    labels = [SOURCE_LABELS.get(s, s) for s, _ in items]
-    values = [v for _, v in items]
-    colors = [ACCENT_RED if s in MARKETPLACE_SOURCES else BRAND_BLUE
-              for s, _ in items]
+    labels = df.attrs["source_labels"][counts.index.codes]
+    values = counts.tolist()
+    colors = source_colors(list(counts.index))
 
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.barh(labels, values, color=colors, edgecolor="white", height=0.6)
+    ax = new_axes(fig, (10, 6))
+    bars = ax.barh(labels, values, color=colors, linewidth=0, height=0.6)
     style_axes(ax, "Product Catalogue Size by Platform",
                ylabel="Platform", xlabel="Number of Listings")
 
-    for bar, val in zip(bars, values):
-        ax.text(bar.get_width() + 12, bar.get_y() + bar.get_height() / 2,
-                f"{val:,}", va="center", ha="left", fontsize=9, color=TEXT_DARK)
+    ax.bar_label(bars, labels=[f"{v:,}" for v in values], padding=3,
+                 fontsize=9, color=TEXT_DARK)
 
     ax.set_xlim(0, max(values) * 1.15)
     patches = [
@@ -129,53 +240,38 @@ def chart_catalogue_size(rows: list[dict]) -> None:
         mpatches.Patch(color=ACCENT_RED, label="Marketplace"),
     ]
     ax.legend(handles=patches, loc="lower right", framealpha=0.9, fontsize=9)
-    fig.tight_layout()
     save(fig, "catalogue_size.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 2 — Median Price by Retail Store
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_median_price_retail(rows: list[dict]) -> None:
-    prices_by_src: dict[str, list[float]] = defaultdict(list)
-    for r in rows:
-        if r["source"] not in RETAIL_SOURCES:
-            continue
-        p = valid_price(r)
-        if p:
-            prices_by_src[r["source"]].append(p)
-
-    items = sorted(
-        [(s, statistics.median(ps)) for s, ps in prices_by_src.items()],
-        key=lambda x: x[1],
-    )
-    labels = [SOURCE_LABELS[s] for s, _ in items]
-    medians = [m for _, m in items]
-    overall_med = statistics.median(
-        [p for ps in prices_by_src.values() for p in ps]
-    )
-
-    fig, ax = plt.subplots(figsize=(10, 5))
-    bars = ax.bar(labels, medians, color=BRAND_BLUE, edgecolor="white", width=0.6)
+def chart_median_price_retail(df: pd.DataFrame, fig: plt.Figure) -> None:
+    retail  = df[df["is_retail"] & df["price_valid"]]
+    by_src  = (retail.groupby("source", observed=True)["price_current"]
+                     .median().sort_values(kind="stable"))
+    labels  = df.attrs["source_labels"][by_src.index.codes]
+    medians = by_src.tolist()
+    overall_med = float(retail["price_current"].median())
+
+    ax = new_axes(fig, (10, 5))
+    bars = ax.bar(labels, medians, color=BRAND_BLUE, linewidth=0, width=0.6)
     ax.axhline(overall_med, color=ACCENT_RED, linewidth=1.5,
                linestyle="--", label=f"Avg Median: {overall_med:.0f} AZN")
 
-    for bar, val in zip(bars, medians):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 15,
-                f"{val:.0f}", ha="center", va="bottom", fontsize=9, color=TEXT_DARK)
+    ax.bar_label(bars, fmt="{:.0f}", padding=3, fontsize=9, color=TEXT_DARK)
 
     style_axes(ax, "Median Tablet Price by Retail Store",
                ylabel="Median Price (AZN)", xlabel="")
     ax.legend(fontsize=9)
     ax.set_ylim(0, max(medians) * 1.2)
-    fig.tight_layout()
     save(fig, "median_price_retail.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 3 — Price Segment Mix (stacked bar)
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_price_segments(rows: list[dict]) -> None:
+def chart_price_segments(df: pd.DataFrame, fig: plt.Figure) -> None:
     TIERS = [
         ("Under 300 AZN",    0,    300,  "#5c94d4"),
         ("300 – 600 AZN",   300,   600,  BRAND_BLUE),
@@ -183,85 +279,75 @@ def chart_price_segments(rows: list[dict]) -> None:
         ("Over 1 200 AZN", 1200, 99999, ACCENT_RED),
     ]
 
-    sources = [s for s in RETAIL_SOURCES + ["birmarket.az"]
-               if s in set(r["source"] for r in rows)]
-    label_map = SOURCE_LABELS
-
-    tier_data: dict[str, list[float]] = {t[0]: [] for t in TIERS}
+    categories = df["source"].cat.categories
+    sources    = [s for s in RETAIL_SOURCES + ["birmarket.az"] if s in categories]
 
-    for src in sources:
-        src_rows = [r for r in rows if r["source"] == src]
-        total    = sum(1 for r in src_rows if valid_price(r))
-        if not total:
-            for t in TIERS:
-                tier_data[t[0]].append(0)
-            continue
-        for tier, lo, hi, _ in TIERS:
-            count = sum(
-                1 for r in src_rows
-                if valid_price(r) and lo <= valid_price(r) < hi
-            )
-            tier_data[tier].append(100 * count / total)
-
-    x       = np.arange(len(sources))
-    width   = 0.55
-    bottoms = np.zeros(len(sources))
-    labels  = [label_map.get(s, s) for s in sources]
-
-    fig, ax = plt.subplots(figsize=(12, 6))
-    for tier, lo, hi, color in TIERS:
-        vals = tier_data[tier]
-        ax.bar(x, vals, width, bottom=bottoms, label=tier, color=color,
-               edgecolor="white")
-        bottoms += np.array(vals)
+    counts, totals = price_bin_counts(
+        df, [lo for _, lo, _, _ in TIERS] + [TIERS[-1][2]]
+    )
+    rows   = categories.get_indexer(sources)
+    counts = counts[rows]
+    totals = totals[rows][:, None]
+
+    # shares[i, j] = % of source i's valid prices falling in tier j
+    shares = np.divide(100 * counts, totals,
+                       out=np.zeros(counts.shape), where=totals > 0)
+
+    x      = np.arange(len(sources))
+    width  = 0.55
+    labels = df.attrs["source_labels"][rows]
+
+    # every (platform, tier) block goes into one PolyCollection → one draw call
+    tops    = np.cumsum(shares, axis=1)
+    bottoms = tops - shares
+    left    = np.broadcast_to((x - width / 2)[:, None], shares.shape)
+    right   = np.broadcast_to((x + width / 2)[:, None], shares.shape)
+    verts   = np.stack([np.stack(c, axis=-1) for c in
+                        ((left, bottoms), (left, tops),
+                         (right, tops), (right, bottoms))], axis=2)
+    tier_colors = [color for _, _, _, color in TIERS]
+
+    ax = new_axes(fig, (12, 6))
+    ax.add_collection(PolyCollection(
+        verts.reshape(-1, 4, 2),
+        facecolors=np.tile(tier_colors, len(sources)),
+        linewidths=0, rasterized=True,
+    ))
+    ax.autoscale_view()
 
     ax.set_xticks(x)
     ax.set_xticklabels(labels, rotation=20, ha="right", fontsize=9)
     style_axes(ax, "Price Segment Distribution by Platform",
                ylabel="Share of Catalogue (%)")
     ax.set_ylim(0, 105)
-    ax.legend(loc="upper left", fontsize=9, framealpha=0.9)
-    fig.tight_layout()
+    patches = [mpatches.Patch(color=color, label=tier)
+               for tier, _, _, color in TIERS]
+    ax.legend(handles=patches, loc="upper left", fontsize=9, framealpha=0.9)
     save(fig, "price_segments.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 4 — Discount Depth
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_discount_depth(rows: list[dict]) -> None:
-    def extract_pct(s: str) -> float | None:
-        m = re.search(r"[\d.]+", s.strip())
-        return float(m.group()) if m else None
-
-    avg_data, max_data, src_labels = [], [], []
-
-    for src in sorted(set(r["source"] for r in rows)):
-        discs = [
-            extract_pct(r["discount_pct"])
-            for r in rows
-            if r["source"] == src and r.get("discount_pct", "").strip()
-            and extract_pct(r["discount_pct"]) is not None
-        ]
-        if not discs:
-            continue
-        src_labels.append(SOURCE_LABELS.get(src, src))
-        avg_data.append(statistics.mean(discs))
-        max_data.append(max(discs))
+def chart_discount_depth(df: pd.DataFrame, fig: plt.Figure) -> None:
+    stats = (df.dropna(subset=["discount_pct_num"])
+               .groupby("source", observed=True)["discount_pct_num"]
+               .agg(["mean", "max"]))
+
+    src_labels = df.attrs["source_labels"][stats.index.codes]
+    avg_data   = stats["mean"].tolist()
+    max_data   = stats["max"].tolist()
 
     x     = np.arange(len(src_labels))
     width = 0.38
-    fig, ax = plt.subplots(figsize=(9, 5))
+    ax = new_axes(fig, (9, 5))
     bars1 = ax.bar(x - width / 2, avg_data, width, label="Average Discount",
-                   color=BRAND_BLUE, edgecolor="white")
+                   color=BRAND_BLUE, linewidth=0)
     bars2 = ax.bar(x + width / 2, max_data, width, label="Maximum Discount",
-                   color=ACCENT_RED, edgecolor="white")
+                   color=ACCENT_RED, linewidth=0)
 
-    for bar, val in zip(bars1, avg_data):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
-                f"{val:.0f}%", ha="center", va="bottom", fontsize=9)
-    for bar, val in zip(bars2, max_data):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
-                f"{val:.0f}%", ha="center", va="bottom", fontsize=9)
+    for bars in (bars1, bars2):
+        ax.bar_label(bars, fmt="{:.0f}%", padding=3, fontsize=9)
 
     ax.set_xticks(x)
     ax.set_xticklabels(src_labels, fontsize=10)
@@ -269,57 +355,45 @@ def chart_discount_depth(rows: list[dict]) -> None:
                ylabel="Discount (%)")
     ax.set_ylim(0, max(max_data) * 1.2)
     ax.legend(fontsize=9)
-    fig.tight_layout()
     save(fig, "discount_depth.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 5 — Installment Financing Coverage
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_installment_coverage(rows: list[dict]) -> None:
-    INST_COLS = ["installment_6m", "installment_12m", "installment_18m",
-                 "installment_monthly", "installment", "installment_active_price"]
-
-    results, src_labels = [], []
-    for src in RETAIL_SOURCES:
-        src_rows = [r for r in rows if r["source"] == src]
-        if not src_rows:
-            continue
-        has_inst = sum(
-            1 for r in src_rows
-            if any(r.get(c, "").strip() for c in INST_COLS)
-        )
-        pct = 100 * has_inst / len(src_rows)
-        results.append(pct)
-        src_labels.append(SOURCE_LABELS[src])
+def chart_installment_coverage(df: pd.DataFrame, fig: plt.Figure) -> None:
+    coverage = (100 * df.groupby("source", observed=True)["has_inst"].mean()
+                ).reindex(RETAIL_SOURCES).dropna()
+
+    results    = coverage.tolist()
+    src_labels = df.attrs["source_labels"][
+        df["source"].cat.categories.get_indexer(coverage.index)]
 
     # sort by coverage
     paired = sorted(zip(results, src_labels), key=lambda x: x[0])
     results_s = [p[0] for p in paired]
     labels_s  = [p[1] for p in paired]
 
-    colors = [ACCENT_GREEN if p == 100 else BRAND_BLUE if p > 50 else ACCENT_RED
-              for p in results_s]
+    pcts   = np.asarray(results_s)
+    colors = np.select([pcts == 100, pcts > 50], [ACCENT_GREEN, BRAND_BLUE],
+                       default=ACCENT_RED)
 
-    fig, ax = plt.subplots(figsize=(10, 5))
-    bars = ax.barh(labels_s, results_s, color=colors, edgecolor="white", height=0.55)
+    ax = new_axes(fig, (10, 5))
+    bars = ax.barh(labels_s, results_s, color=colors, linewidth=0, height=0.55)
     ax.axvline(100, color=GREY_MID, linewidth=1, linestyle="--")
 
-    for bar, val in zip(bars, results_s):
-        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
-                f"{val:.0f}%", va="center", fontsize=9)
+    ax.bar_label(bars, fmt="{:.0f}%", padding=3, fontsize=9)
 
     ax.set_xlim(0, 115)
     style_axes(ax, "Installment Financing Coverage by Retail Store",
                xlabel="% of Products with Financing Options")
-    fig.tight_layout()
     save(fig, "installment_coverage.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 6 — Secondary Market vs Retail Price Distribution
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_tap_vs_retail(rows: list[dict]) -> None:
+def chart_tap_vs_retail(df: pd.DataFrame, fig: plt.Figure) -> None:
     BUCKETS = [
         ("< 200",   0,   200),
         ("200–400", 200, 400),
@@ -328,87 +402,83 @@ def chart_tap_vs_retail(rows: list[dict]) -> None:
         ("> 1200", 1200, 99999),
     ]
 
-    def bucket_pcts(price_list: list[float]) -> list[float]:
-        total = len(price_list)
+    def bucket_pcts(counts: np.ndarray, total: int) -> list[float]:
         if not total:
             return [0] * len(BUCKETS)
-        return [
-            100 * sum(1 for p in price_list if lo <= p < hi) / total
-            for _, lo, hi in BUCKETS
-        ]
+        return (100 * counts / total).tolist()
 
-    tap_prices  = [p for r in rows if r["source"] == "tap.az"
-                   if (p := valid_price(r))]
-    retail_prices = [p for r in rows
-                     if r["source"] in RETAIL_SOURCES
-                     if (p := valid_price(r))]
+    labels = [b[0] for b in BUCKETS]
+    counts, totals = price_bin_counts(
+        df, [lo for _, lo, _ in BUCKETS] + [BUCKETS[-1][2]]
+    )
+    categories = df["source"].cat.categories
+    is_retail  = categories.isin(RETAIL_SOURCES_SET)
+    is_tap     = categories == "tap.az"
 
-    tap_pcts    = bucket_pcts(tap_prices)
-    retail_pcts = bucket_pcts(retail_prices)
+    tap_pcts    = bucket_pcts(counts[is_tap].sum(axis=0), totals[is_tap].sum())
+    retail_pcts = bucket_pcts(counts[is_retail].sum(axis=0),
+                              totals[is_retail].sum())
 
     x      = np.arange(len(BUCKETS))
     width  = 0.38
-    labels = [b[0] for b in BUCKETS]
 
-    fig, ax = plt.subplots(figsize=(11, 5))
+    ax = new_axes(fig, (11, 5))
     b1 = ax.bar(x - width / 2, retail_pcts, width, label="Retail Stores",
-                color=BRAND_BLUE, edgecolor="white")
+                color=BRAND_BLUE, linewidth=0, rasterized=True)
     b2 = ax.bar(x + width / 2, tap_pcts,    width, label="tap.az (Marketplace)",
-                color=ACCENT_RED, edgecolor="white")
+                color=ACCENT_RED, linewidth=0, rasterized=True)
 
-    for bar, val in zip(list(b1) + list(b2), retail_pcts + tap_pcts):
-        if val > 1:
-            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.4,
-                    f"{val:.0f}%", ha="center", va="bottom", fontsize=8)
+    for bars, pcts in ((b1, retail_pcts), (b2, tap_pcts)):
+        ax.bar_label(bars, labels=[f"{v:.0f}%" if v > 1 else "" for v in pcts],
+                     padding=3, fontsize=8)
 
     ax.set_xticks(x)
     ax.set_xticklabels(labels, fontsize=10)
     style_axes(ax, "Secondary Market vs Retail: Price Distribution",
                ylabel="Share of Listings (%)", xlabel="Price Range (AZN)")
     ax.legend(fontsize=9)
-    fig.tight_layout()
     save(fig, "tap_vs_retail_prices.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 7 — Samsung Galaxy Tab A9 Price Range Across Platforms
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_samsung_tab_a9(rows: list[dict]) -> None:
+def chart_samsung_tab_a9(df: pd.DataFrame, fig: plt.Figure) -> None:
     keyword = "Tab A9"
-    prices_by_src: dict[str, list[float]] = defaultdict(list)
 
-    for r in rows:
-        if keyword not in r.get("name", ""):
-            continue
-        p = valid_price(r)
-        if p and p > 50:           # exclude accessories
-            prices_by_src[r["source"]].append(p)
+    # price > 50 AZN excludes accessories
+    sub = df[df["name"].str.contains(keyword, regex=False, na=False)
+             & df["price_valid"] & (df["price_current"] > 50)]
 
-    if not prices_by_src:
+    if sub.empty:
         print("  [skip] no Samsung Tab A9 data found")
         return
 
-    items = sorted(prices_by_src.items(), key=lambda x: statistics.median(x[1]))
-    labels  = [SOURCE_LABELS.get(s, s) for s, _ in items]
-    medians = [statistics.median(ps) for _, ps in items]
-    mins_   = [min(ps)               for _, ps in items]
-    maxs_   = [max(ps)               for _, ps in items]
+    stats = (sub.groupby("source", observed=True)["price_current"]
+                .agg(["median", "min", "max"])
+                .sort_values("median", kind="stable"))
+    labels  = df.attrs["source_labels"][stats.index.codes]
+    medians = stats["median"].tolist()
+    mins_   = stats["min"].tolist()
+    maxs_   = stats["max"].tolist()
 
     y = np.arange(len(labels))
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    ax = new_axes(fig, (10, 6))
     # Range bars (min → max)
-    for i, (lo, hi) in enumerate(zip(mins_, maxs_)):
-        ax.barh(y[i], hi - lo, left=lo, height=0.35,
-                color=GREY_MID, edgecolor="white", zorder=2)
+    ranges = ax.barh(y, stats["max"] - stats["min"], left=stats["min"],
+                     height=0.35, color=GREY_MID, linewidth=0, zorder=2,
+                     rasterized=True)
     # Median dots
-    ax.scatter(medians, y, color=BRAND_BLUE, s=80, zorder=4, label="Median price")
-    # Min/Max labels
-    for i, (lo, med, hi) in enumerate(zip(mins_, medians, maxs_)):
+    ax.scatter(medians, y, color=BRAND_BLUE, s=80, zorder=4, label="Median price",
+               rasterized=True)
+    # Max labels sit on the bar edge; bar_label has no "start" position, so
+    # the min labels are placed by hand
+    ax.bar_label(ranges, labels=[f"{hi:.0f}" for hi in maxs_], padding=6,
+                 fontsize=8, color=TEXT_DARK)
+    for i, lo in enumerate(mins_):
         ax.text(lo - 8, y[i], f"{lo:.0f}", va="center", ha="right",
                 fontsize=8, color=TEXT_DARK)
-        ax.text(hi + 8, y[i], f"{hi:.0f}", va="center", ha="left",
-                fontsize=8, color=TEXT_DARK)
 
     ax.set_yticks(y)
     ax.set_yticklabels(labels, fontsize=9)
@@ -416,22 +486,20 @@ def chart_samsung_tab_a9(rows: list[dict]) -> None:
                xlabel="Price (AZN)")
     ax.legend(fontsize=9, loc="lower right")
     ax.set_xlim(0, max(maxs_) * 1.18)
-    fig.tight_layout()
     save(fig, "samsung_tab_a9_range.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 8 — Installment Term Preference (birmarket)
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_installment_terms(rows: list[dict]) -> None:
+def chart_installment_terms(df: pd.DataFrame, fig: plt.Figure) -> None:
     from collections import Counter
-    bm = [r for r in rows
-          if r["source"] == "birmarket.az" and r.get("installment_term", "").strip()]
-    term_counts = Counter(r["installment_term"] for r in bm)
+    bm = df.loc[df["source"] == "birmarket.az", "installment_term"].dropna()
+    term_counts = Counter(t for t in bm if t.strip())
 
     # normalise term labels
     def normalise(t: str) -> str:
-        m = re.search(r"\d+", t)
+        m = _DIGITS_RE.search(t)
         return f"{m.group()} months" if m else t
 
     items = sorted(
@@ -441,42 +509,29 @@ def chart_installment_terms(rows: list[dict]) -> None:
     labels = [i[0] for i in items]
     counts = [i[1] for i in items]
 
-    fig, ax = plt.subplots(figsize=(9, 5))
-    bars = ax.bar(labels, counts, color=BRAND_BLUE, edgecolor="white", width=0.55)
-    for bar, val in zip(bars, counts):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 4,
-                str(val), ha="center", va="bottom", fontsize=9)
+    ax = new_axes(fig, (9, 5))
+    bars = ax.bar(labels, counts, color=BRAND_BLUE, linewidth=0, width=0.55)
+    ax.bar_label(bars, padding=3, fontsize=9)
     style_axes(ax, "Most Popular Installment Terms — birmarket.az",
                ylabel="Number of Listings", xlabel="Installment Term")
-    fig.tight_layout()
     save(fig, "installment_terms.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHART 9 — Price Positioning: Retail vs birmarket vs tap.az
 # ═══════════════════════════════════════════════════════════════════════════════
-def chart_median_all_platforms(rows: list[dict]) -> None:
+def chart_median_all_platforms(df: pd.DataFrame, fig: plt.Figure) -> None:
     """Median price for every platform (retail + marketplaces) side by side."""
-    prices_by_src: dict[str, list[float]] = defaultdict(list)
-    for r in rows:
-        p = valid_price(r)
-        if p:
-            prices_by_src[r["source"]].append(p)
-
-    items = sorted(
-        [(s, statistics.median(ps)) for s, ps in prices_by_src.items()],
-        key=lambda x: x[1],
-    )
-    labels  = [SOURCE_LABELS.get(s, s) for s, _ in items]
-    medians = [m for _, m in items]
-    colors  = [ACCENT_RED if s in MARKETPLACE_SOURCES else BRAND_BLUE
-               for s, _ in items]
-
-    fig, ax = plt.subplots(figsize=(11, 5))
-    bars = ax.bar(labels, medians, color=colors, edgecolor="white", width=0.6)
-    for bar, val in zip(bars, medians):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 10,
-                f"{val:.0f}", ha="center", va="bottom", fontsize=9)
+    by_src  = (df[df["price_valid"]]
+                 .groupby("source", observed=True)["price_current"]
+                 .median().sort_values(kind="stable"))
+    labels  = df.attrs["source_labels"][by_src.index.codes]
+    medians = by_src.tolist()
+    colors  = source_colors(list(by_src.index))
+
+    ax = new_axes(fig, (11, 5))
+    bars = ax.bar(labels, medians, color=colors, linewidth=0, width=0.6)
+    ax.bar_label(bars, fmt="{:.0f}", padding=3, fontsize=9)
     style_axes(ax, "Median Listing Price: All Platforms Compared",
                ylabel="Median Price (AZN)")
     ax.set_xticks(range(len(labels)))
@@ -487,28 +542,56 @@ def chart_median_all_platforms(rows: list[dict]) -> None:
     ]
     ax.legend(handles=patches, fontsize=9)
     ax.set_ylim(0, max(medians) * 1.2)
-    fig.tight_layout()
     save(fig, "median_all_platforms.png")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════════════════
+CHARTS = {
+    "catalogue_size":       chart_catalogue_size,
+    "median_price_retail":  chart_median_price_retail,
+    "price_segments":       chart_price_segments,
+    "discount_depth":       chart_discount_depth,
+    "installment_coverage": chart_installment_coverage,
+    "tap_vs_retail":        chart_tap_vs_retail,
+    "samsung_tab_a9":       chart_samsung_tab_a9,
+    "installment_terms":    chart_installment_terms,
+    "median_all_platforms": chart_median_all_platforms,
+}
+
+# per-process state for the worker pool (set by _init_worker)
+_worker_df:  pd.DataFrame | None = None
+_worker_fig: plt.Figure | None   = None
+
+def _init_worker(df: pd.DataFrame) -> None:
+    """Give each worker its own copy of the data and one reusable Figure."""
+    global _worker_df, _worker_fig
+    _worker_df  = df
+    # constrained layout is solved at draw time, once per savefig
+    _worker_fig = plt.figure(layout="constrained")
+
+def _render_one(name: str) -> None:
+    CHARTS[name](_worker_df, _worker_fig)
+
+
 def main() -> None:
     print(f"Loading {DATA_FILE} …")
-    rows = load()
-    print(f"  {len(rows):,} rows loaded\n")
-
-    print("Generating charts …")
-    chart_catalogue_size(rows)
-    chart_median_price_retail(rows)
-    chart_price_segments(rows)
-    chart_discount_depth(rows)
-    chart_installment_coverage(rows)
-    chart_tap_vs_retail(rows)
-    chart_samsung_tab_a9(rows)
-    chart_installment_terms(rows)
-    chart_median_all_platforms(rows)
+    df = load()
+    print(f"  {len(df):,} rows loaded\n")
+
+    # Charts are independent and dominated by Agg rendering + PNG encoding,
+    # so they are spread across processes (matplotlib is not thread-safe).
+    workers = min(len(CHARTS), os.cpu_count() or 1)
+    print(f"Generating charts ({workers} workers) …")
+    if workers == 1:
+        _init_worker(df)
+        for name in CHARTS:
+            _render_one(name)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(df,)) as pool:
+            list(pool.map(_render_one, CHARTS))
 
     print(f"\nAll charts saved to {CHARTS_DIR}/")
 
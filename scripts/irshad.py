@@ -13,10 +13,13 @@ Pagination stops when the response contains no #loadMore button.
 import asyncio
 import csv
 import re
+from operator import itemgetter
 from pathlib import Path
 
 import aiohttp
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+from _scrape_common import RateLimiter, _KeepChars
 
 # ── paths ────────────────────────────────────────────────────────────────────
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,7 +41,9 @@ COMMON_HEADERS = {
         "Chrome/124.0.0.0 Safari/537.36"
     ),
     "Accept-Language": "az,en-US;q=0.9,en;q=0.8,ru;q=0.7",
-    "Accept-Encoding": "gzip, deflate, br",
+    # no br: aiohttp can only decode it with the optional brotli package,
+    # and zlib-backed gzip is cheap to inflate anyway
+    "Accept-Encoding": "gzip, deflate",
     "DNT": "1",
     "Connection": "keep-alive",
     "sec-ch-ua": '"Chromium";v="124","Google Chrome";v="124"',
@@ -64,86 +69,108 @@ CSV_FIELDS = [
 ]
 
 
+# ── CSS selectors (every markup assumption lives here) ───────────────────────
+SEL_CARD       = "div.product"
+SEL_NAME       = "a.product__name.product-link"
+SEL_TYPE       = ".product__type"
+SEL_BASKET     = "a.product-add-to-cart[data-code]"
+SEL_ACTIVE     = ".product__flex-right:not(.d-none), .product__flex-right"
+SEL_PRICE      = ".product__price__current"
+SEL_NEW_PRICE  = ".new-price"
+SEL_OLD_PRICE  = ".old-price"
+SEL_DISC_PCT   = ".product-discount-text"
+SEL_DISC_AMT   = ".product__label--orange"
+SEL_AVAIL      = ".product__label--light-purple, .product__label--light-orange"
+SEL_INST       = "input.ppl-input[data-monthly-payment]"
+SEL_INST_LABEL = "label[for]"
+SEL_IMG        = ".product__img img"
+SEL_LOAD_MORE  = "#loadMore"
+SEL_CSRF       = 'meta[name="csrf-token"]'
+
+
 # ── helpers ──────────────────────────────────────────────────────────────────
 
+_PRICE_CHARS = _KeepChars(".")
+
+
 def clean_price(text: str) -> str:
     """'649.99 AZN' → '649.99'"""
-    return re.sub(r"[^\d.]", "", text.replace(",", ".")).strip()
+    return text.replace(",", ".").translate(_PRICE_CHARS)
 
 
-def parse_products(html: str, page_num: int) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
+def parse_products_tree(tree: LexborHTMLParser, page_num: int) -> list[dict]:
     products = []
 
-    for card in soup.select("div.product"):
+    for card in tree.css(SEL_CARD):
         # skip nested or utility divs that aren't product cards
-        classes = " ".join(card.get("class", []))
+        classes = card.attributes.get("class") or ""
         if "product__" in classes:
             continue
 
         # ── name & URL ───────────────────────────────────────────────────
-        name_link = card.select_one("a.product__name.product-link")
+        name_link = card.css_first(SEL_NAME)
         if not name_link:
             continue
-        name = name_link.get_text(strip=True)
-        url  = name_link.get("href", "")
+        name = name_link.text(strip=True)
+        url  = name_link.attributes.get("href") or ""
 
         # ── product type (Planşet / etc.) ─────────────────────────────
-        type_el = card.select_one(".product__type")
-        product_type = type_el.get_text(strip=True) if type_el else ""
+        type_el = card.css_first(SEL_TYPE)
+        product_type = type_el.text(strip=True) if type_el else ""
 
         # ── product code ──────────────────────────────────────────────
         # Use data-code from the basket button of the active variant
-        basket_btns = card.select("a.product-add-to-cart[data-code]")
         # The active product__flex-right is the one without d-none
-        active_right = card.select_one(
-            ".product__flex-right:not(.d-none), .product__flex-right"
-        )
+        active_right = card.css_first(SEL_ACTIVE)
         code = ""
         if active_right:
-            btn = active_right.select_one("a.product-add-to-cart[data-code]")
+            btn = active_right.css_first(SEL_BASKET)
+            if btn:
+                code = btn.attributes.get("data-code") or ""
+        if not code:   # fall back to the card's first basket button
+            btn = card.css_first(SEL_BASKET)
             if btn:
-                code = btn.get("data-code", "")
-        if not code and basket_btns:
-            code = basket_btns[0].get("data-code", "")
+                code = btn.attributes.get("data-code") or ""
 
         # ── prices ────────────────────────────────────────────────────
         price_current = price_old = ""
         price_block = None
         if active_right:
-            price_block = active_right.select_one(".product__price__current")
+            price_block = active_right.css_first(SEL_PRICE)
         if not price_block:
-            price_block = card.select_one(".product__price__current")
+            price_block = card.css_first(SEL_PRICE)
         if price_block:
-            new_el = price_block.select_one(".new-price")
-            old_el = price_block.select_one(".old-price")
+            new_el = price_block.css_first(SEL_NEW_PRICE)
+            old_el = price_block.css_first(SEL_OLD_PRICE)
             if new_el:
-                price_current = clean_price(new_el.get_text())
+                price_current = clean_price(new_el.text())
             if old_el:
-                price_old = clean_price(old_el.get_text())
+                price_old = clean_price(old_el.text())
 
         # ── discount % ────────────────────────────────────────────────
-        disc_el = card.select_one(".product-discount-text")
-        discount_pct = disc_el.get_text(strip=True) if disc_el else ""
+        disc_el = card.css_first(SEL_DISC_PCT)
+        discount_pct = disc_el.text(strip=True) if disc_el else ""
 
         # ── discount amount label (e.g. "-150 AZN") ───────────────────
-        disc_amt_el = card.select_one(".product__label--orange")
-        discount_amount = disc_amt_el.get_text(strip=True) if disc_amt_el else ""
+        disc_amt_el = card.css_first(SEL_DISC_AMT)
+        discount_amount = disc_amt_el.text(strip=True) if disc_amt_el else ""
 
         # ── availability ──────────────────────────────────────────────
-        avail_el = card.select_one(
-            ".product__label--light-purple, .product__label--light-orange"
-        )
-        availability = avail_el.get_text(strip=True) if avail_el else ""
+        avail_el = card.css_first(SEL_AVAIL)
+        availability = avail_el.text(strip=True) if avail_el else ""
 
         # ── installment options (6 / 12 / 18 ay monthly payments) ─────
         inst: dict[str, str] = {}
         if active_right:
-            for inp in active_right.select("input.ppl-input[data-monthly-payment]"):
-                label_id = inp.get("id", "")
-                label_el = active_right.select_one(f'label[for="{label_id}"]')
-                months = label_el.get_text(strip=True) if label_el else ""
-                monthly = inp.get("data-monthly-payment", "")
+            # one walk for all labels instead of a label[for=…] query per input
+            labels: dict[str, str] = {}
+            for label_el in active_right.css(SEL_INST_LABEL):
+                labels.setdefault(label_el.attributes.get("for") or "",
+                                  label_el.text(strip=True))
+            for inp in active_right.css(SEL_INST):
+                attrs   = inp.attributes
+                months  = labels.get(attrs.get("id") or "", "")
+                monthly = attrs.get("data-monthly-payment") or ""
                 if "6" in months:
                     inst["6"] = monthly
                 elif "12" in months:
@@ -152,8 +179,8 @@ def parse_products(html: str, page_num: int) -> list[dict]:
                     inst["18"] = monthly
 
         # ── image ─────────────────────────────────────────────────────
-        img_el = card.select_one(".product__img img")
-        image_url = img_el.get("src", "") if img_el else ""
+        img_el = card.css_first(SEL_IMG)
+        image_url = (img_el.attributes.get("src") or "") if img_el else ""
 
         products.append({
             "name":            name,
@@ -175,22 +202,53 @@ def parse_products(html: str, page_num: int) -> list[dict]:
     return products
 
 
-def has_more_pages(html: str) -> bool:
-    """True if the HTML contains a Load More button (i.e. more pages exist)."""
-    soup = BeautifulSoup(html, "html.parser")
-    btn = soup.select_one("#loadMore")
-    return btn is not None
+def parse_page(html: str, page_num: int) -> tuple[list[dict], bool]:
+    """
+    Parse one page once; return its products and whether it has a Load More
+    button (i.e. more pages exist).
+    """
+    tree = LexborHTMLParser(html)
+    return parse_products_tree(tree, page_num), tree.css_first(SEL_LOAD_MORE) is not None
 
 
-def get_csrf_token(html: str) -> str:
-    """Extract CSRF token from <meta name='csrf-token'>."""
-    soup = BeautifulSoup(html, "html.parser")
-    meta = soup.select_one('meta[name="csrf-token"]')
-    return meta.get("content", "") if meta else ""
+_CSRF_RE = re.compile(rb'<meta\s+name="csrf-token"\s+content="([^"]*)"', re.I)
+
+
+def get_csrf_token(raw: bytes) -> str:
+    """Extract CSRF token from <meta name='csrf-token'> in the raw page."""
+    # the tag sits near the top of <head>; a bounded byte scan finds it
+    # without decoding or parsing the page
+    m = _CSRF_RE.search(raw, 0, 8192)
+    if m:
+        return m.group(1).decode("utf-8", errors="replace")
+
+    # attributes in another order, or a long <head> — parse just the head
+    head_end = raw.find(b"</head>")
+    if head_end >= 0:
+        raw = raw[:head_end]
+    meta = LexborHTMLParser(raw).css_first(SEL_CSRF)
+    return (meta.attributes.get("content") or "") if meta else ""
+
+
+def add_unique(products: dict[str | int, dict], page_products: list[dict]) -> None:
+    """
+    Merge one page into `products`, keeping the first listing seen per code
+    (falling back to url); listings with neither are all kept.
+    """
+    for p in page_products:
+        products.setdefault(p["code"] or p["url"] or id(p), p)
 
 
 # ── async fetch ──────────────────────────────────────────────────────────────
 
+def make_resolver() -> aiohttp.abc.AbstractResolver:
+    """Non-blocking c-ares lookups when aiodns is installed, else getaddrinfo."""
+    try:
+        return aiohttp.AsyncResolver()
+    except RuntimeError:   # aiodns not installed
+        return aiohttp.ThreadedResolver()
+
+
 async def bootstrap_session(session: aiohttp.ClientSession) -> str:
     """
     Fetch the main listing page to prime cookies and retrieve CSRF token.
@@ -199,11 +257,9 @@ async def bootstrap_session(session: aiohttp.ClientSession) -> str:
     headers = {**COMMON_HEADERS, "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"}
     async with session.get(LISTING_URL, headers=headers) as resp:
         resp.raise_for_status()
-        html = await resp.text()
-        token = get_csrf_token(html)
+        token = get_csrf_token(await resp.read())
         print(f"  Session primed — CSRF token: {token[:16]}…")
-        # parse page 1 from the listing page too
-        return token, html
+        return token
 
 
 async def fetch_ajax_page(
@@ -211,6 +267,7 @@ async def fetch_ajax_page(
     page: int,
     csrf_token: str,
     sem: asyncio.Semaphore,
+    limiter: RateLimiter,
 ) -> tuple[int, str]:
     """Fetch one AJAX product page."""
     params = {"page": page}
@@ -224,67 +281,129 @@ async def fetch_ajax_page(
         "Sec-Fetch-Site": "same-origin",
         "Referer": LISTING_URL,
     }
-    async with sem:
-        await asyncio.sleep(DELAY)
+    async with sem, limiter:
         async with session.get(AJAX_URL, params=params, headers=headers) as resp:
             resp.raise_for_status()
-            html = await resp.text()
+            html = (await resp.read()).decode("utf-8", errors="replace")
             print(f"  Fetched page {page}  [status {resp.status}]")
             return page, html
 
 
+async def fetch_and_parse(
+    session: aiohttp.ClientSession,
+    page: int,
+    csrf_token: str,
+    sem: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> tuple[int, list[dict], bool]:
+    """
+    Fetch one AJAX page and parse it on a worker thread. Lexbor releases the
+    GIL while building the tree, so the event loop keeps reading the other
+    in-flight responses meanwhile.
+    """
+    page, html = await fetch_ajax_page(session, page, csrf_token, sem, limiter)
+    return page, *await asyncio.to_thread(parse_page, html, page)
+
+
+async def walk_ajax_pages(
+    session: aiohttp.ClientSession,
+    csrf_token: str,
+    sem: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> list[list[dict]]:
+    """
+    Fetch AJAX pages 2, 3, … with CONCURRENCY in flight and return each
+    page's products in page order. A page with no products or no loadMore
+    button is the last one; the window refills as soon as any page lands
+    instead of waiting for the slowest page of a fixed batch.
+
+    Requests past the last page are cancelled the moment it is known, and
+    nothing is left running when this returns or raises.
+    """
+    pending: dict[asyncio.Task, int] = {}
+    pages: dict[int, list[dict]] = {}
+    last_page: int | None = None
+    next_page = 2
+    failures  = 0   # consecutive; a full window of errors ends the walk
+
+    try:
+        while True:
+            while (last_page is None and failures < CONCURRENCY
+                   and len(pending) < CONCURRENCY):
+                task = asyncio.create_task(
+                    fetch_and_parse(session, next_page, csrf_token, sem, limiter)
+                )
+                pending[task] = next_page
+                next_page += 1
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                p_num = pending.pop(task)
+                if task.cancelled():
+                    continue
+                if task.exception() is not None:
+                    print(f"  [warn] page {p_num}: {task.exception()}")
+                    failures += 1
+                    continue
+                failures = 0
+                _, prods, more = task.result()
+                pages[p_num] = prods
+                print(f"  Page {p_num}: {len(prods)} products")
+                if not prods or not more:
+                    last_page = p_num if last_page is None else min(last_page, p_num)
+
+            # pages past the end can't have products — stop them early;
+            # they come back through asyncio.wait as cancelled
+            if last_page is not None:
+                for task, p_num in pending.items():
+                    if p_num > last_page:
+                        task.cancel()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return [pages[p] for p in sorted(pages) if last_page is None or p <= last_page]
+
+
 # ── main scrape logic ────────────────────────────────────────────────────────
 
 async def scrape_all() -> list[dict]:
-    connector = aiohttp.TCPConnector(ssl=False)
+    # keep one warm connection per concurrent request and reuse it across pages
+    connector = aiohttp.TCPConnector(
+        limit=CONCURRENCY, limit_per_host=CONCURRENCY,
+        resolver=make_resolver(), use_dns_cache=True, ttl_dns_cache=600,
+        keepalive_timeout=60, ssl=False,
+    )
     timeout   = aiohttp.ClientTimeout(total=30)
     sem       = asyncio.Semaphore(CONCURRENCY)
-    all_products: list[dict] = []
+    limiter   = RateLimiter(CONCURRENCY, DELAY)
+    all_products: dict[str | int, dict] = {}
 
     try:
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, auto_decompress=True
+        ) as session:
             # ── step 1: prime session cookies + get CSRF token ───────────
-            csrf_token, _ = await bootstrap_session(session)
+            csrf_token = await bootstrap_session(session)
 
             # ── step 2: all products come from the AJAX endpoint (page=1+)
-            # Fetch page 1 first to check loadMore, then batch the rest.
-            _, html1 = await fetch_ajax_page(session, 1, csrf_token, asyncio.Semaphore(1))
-            prods1 = parse_products(html1, 1)
-            all_products.extend(prods1)
+            # Fetch page 1 first to check loadMore, then walk the rest.
+            _, html1 = await fetch_ajax_page(
+                session, 1, csrf_token, asyncio.Semaphore(1), limiter
+            )
+            prods1, more = parse_page(html1, 1)
+            add_unique(all_products, prods1)
             print(f"  Page 1: {len(prods1)} products")
 
-            if not has_more_pages(html1):
-                return all_products
-
-            # ── step 3: walk remaining AJAX pages concurrently ───────────
-            page = 2
-            while True:
-                tasks = [
-                    fetch_ajax_page(session, p, csrf_token, sem)
-                    for p in range(page, page + CONCURRENCY)
-                ]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                found_more = False
-                for result in sorted(
-                    [r for r in results if not isinstance(r, Exception)],
-                    key=lambda x: x[0]
-                ):
-                    p_num, html = result
-                    prods = parse_products(html, p_num)
-                    all_products.extend(prods)
-                    print(f"  Page {p_num}: {len(prods)} products")
-                    page = max(page, p_num + 1)
-                    # Overwrite: only the LAST processed page determines whether to continue
-                    found_more = bool(prods) and has_more_pages(html)
-                    if not found_more:
-                        break   # no point inspecting further pages in this batch
-                for result in results:
-                    if isinstance(result, Exception):
-                        print(f"  [warn] {result}")
-
-                if not found_more:
-                    break
+            if not more:
+                return list(all_products.values())
+
+            # ── step 3: walk the remaining AJAX pages ─────────────────────
+            for prods in await walk_ajax_pages(session, csrf_token, sem, limiter):
+                add_unique(all_products, prods)
 
     except aiohttp.ClientResponseError as exc:
         if exc.status == 403:
@@ -292,16 +411,36 @@ async def scrape_all() -> list[dict]:
             return await scrape_all_cffi()
         raise
 
-    return all_products
+    return list(all_products.values())
 
 
 # ── curl_cffi fallback ────────────────────────────────────────────────────────
 
-async def scrape_all_cffi() -> list[dict]:
-    from curl_cffi.requests import AsyncSession
+# One curl_cffi session per run, created on first use so curl_cffi stays an
+# optional import; main() closes it.
+_cffi_session = None
+
+
+def get_cffi_session():
+    """Return the run's shared curl_cffi AsyncSession, creating it if needed."""
+    global _cffi_session
+    if _cffi_session is None:
+        from curl_cffi.requests import AsyncSession
+        _cffi_session = AsyncSession(impersonate="chrome124", max_clients=CONCURRENCY)
+    return _cffi_session
+
 
-    sem = asyncio.Semaphore(CONCURRENCY)
-    all_products: list[dict] = []
+async def close_cffi_session() -> None:
+    global _cffi_session
+    if _cffi_session is not None:
+        await _cffi_session.close()
+        _cffi_session = None
+
+
+async def scrape_all_cffi() -> list[dict]:
+    sem     = asyncio.Semaphore(CONCURRENCY)
+    limiter = RateLimiter(CONCURRENCY, DELAY)
+    all_products: dict[str | int, dict] = {}
 
     async def fetch_cffi_ajax(s, page: int) -> tuple[int, str]:
         params  = {"page": page}
@@ -312,61 +451,63 @@ async def scrape_all_cffi() -> list[dict]:
             "X-CSRF-Token": csrf_token,
             "Referer": LISTING_URL,
         }
-        async with sem:
-            await asyncio.sleep(DELAY)
+        async with sem, limiter:
             resp = await s.get(AJAX_URL, params=params, headers=headers)
             resp.raise_for_status()
             print(f"  [cffi] Fetched page {page}  [{resp.status_code}]")
-            return page, resp.text
-
-    async with AsyncSession(impersonate="chrome124") as s:
-        # prime
-        r = await s.get(
-            LISTING_URL,
-            headers={**COMMON_HEADERS, "Accept": "text/html,application/xhtml+xml,*/*;q=0.8"},
-        )
-        csrf_token = get_csrf_token(r.text)
-        html1      = r.text
-        print(f"  [cffi] Session primed — CSRF: {csrf_token[:16]}…")
-
-        prods1 = parse_products(html1, 1)
-        all_products.extend(prods1)
-        print(f"  Page 1 (listing): {len(prods1)} products")
-
-        if not has_more_pages(html1):
-            return all_products
-
-        page = 2
-        while True:
-            tasks  = [fetch_cffi_ajax(s, p) for p in range(page, page + CONCURRENCY)]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            found_more = False
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"  [warn] {result}")
-                    continue
-                p_num, html = result
-                prods = parse_products(html, p_num)
-                all_products.extend(prods)
-                print(f"  Page {p_num}: {len(prods)} products")
-                if has_more_pages(html):
-                    found_more = True
-                page = max(page, p_num + 1)
-
-            if not found_more:
-                break
-
-    return all_products
+            return page, resp.content.decode("utf-8", errors="replace")
+
+    s = get_cffi_session()
+    # prime
+    r = await s.get(
+        LISTING_URL,
+        headers={**COMMON_HEADERS, "Accept": "text/html,application/xhtml+xml,*/*;q=0.8"},
+    )
+    csrf_token = get_csrf_token(r.content)
+    html1      = r.content.decode("utf-8", errors="replace")
+    print(f"  [cffi] Session primed — CSRF: {csrf_token[:16]}…")
+
+    prods1, more = parse_page(html1, 1)
+    add_unique(all_products, prods1)
+    print(f"  Page 1 (listing): {len(prods1)} products")
+
+    if not more:
+        return list(all_products.values())
+
+    page = 2
+    while True:
+        tasks  = [fetch_cffi_ajax(s, p) for p in range(page, page + CONCURRENCY)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        found_more = False
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"  [warn] {result}")
+                continue
+            p_num, html = result
+            prods, more = parse_page(html, p_num)
+            add_unique(all_products, prods)
+            print(f"  Page {p_num}: {len(prods)} products")
+            if more:
+                found_more = True
+            page = max(page, p_num + 1)
+
+        if not found_more:
+            break
+
+    return list(all_products.values())
 
 
 # ── CSV ───────────────────────────────────────────────────────────────────────
 
 def save_csv(products: list[dict], path: Path) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
+    # itemgetter pulls each row's fields in one C call, unlike DictWriter's
+    # per-field lookups
+    row = itemgetter(*CSV_FIELDS)
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(map(row, products))
     print(f"\nSaved {len(products)} products → {path}")
 
 
@@ -374,25 +515,17 @@ def save_csv(products: list[dict], path: Path) -> None:
 
 async def main() -> None:
     print(f"Scraping: {LISTING_URL}")
-    products = await scrape_all()
+    try:
+        products = await scrape_all()
+    finally:
+        await close_cffi_session()
 
     if not products:
         print("No products found — check selectors or connectivity.")
         return
 
-    # deduplicate by code+url
-    seen: set[str] = set()
-    unique = []
-    for p in products:
-        key = p["code"] or p["url"]
-        if key and key not in seen:
-            seen.add(key)
-            unique.append(p)
-        elif not key:
-            unique.append(p)
-
-    print(f"\nTotal unique products: {len(unique)}")
-    save_csv(unique, OUTPUT_CSV)
+    print(f"\nTotal unique products: {len(products)}")
+    save_csv(products, OUTPUT_CSV)
 
 
 if __name__ == "__main__":
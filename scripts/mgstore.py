@@ -14,10 +14,20 @@ import asyncio
 import csv
 import json
 import re
+from operator import itemgetter
 from pathlib import Path
 
 import aiohttp
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+from _scrape_common import RateLimiter, _KeepChars
+
+# orjson parses the per-card data-gtm blobs ~2-3x faster; its
+# JSONDecodeError subclasses json's, so the except clause covers both
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # ── paths ────────────────────────────────────────────────────────────────────
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,7 +49,9 @@ HEADERS = {
     ),
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "az,en-US;q=0.9,en;q=0.8,ru;q=0.7",
-    "Accept-Encoding": "gzip, deflate, br",
+    # no br: aiohttp can only decode it with the optional brotli package,
+    # and zlib-backed gzip is cheap to inflate anyway
+    "Accept-Encoding": "gzip, deflate",
     "Connection": "keep-alive",
     "Cache-Control": "max-age=0",
     "Referer": BASE_URL + "/",
@@ -68,15 +80,33 @@ CSV_FIELDS = [
 ]
 
 
+# ── CSS selectors (every markup assumption lives here) ───────────────────────
+SEL_CARD       = ".prodItem"
+SEL_TITLE      = ".prodItem__title"
+SEL_PRICES     = ".prodItem__prices"
+SEL_INSTALL    = ".prodItem__prices span"
+SEL_LINK       = "a.prodItem__img[href]"
+SEL_PICTURE    = "picture.product-image"
+SEL_SOURCE     = "source[srcset]"
+SEL_IMG        = "img.product-image"
+SEL_PAGE_LINKS = ".pages a.page[href]"
+SEL_COUNT      = ".catalog__count"
+
+
 # ── helpers ──────────────────────────────────────────────────────────────────
 
+_PRICE_CHARS = _KeepChars(",.")
+_PAGE_RE    = re.compile(r"[?&]p=(\d+)")
+_NUM_RE     = re.compile(r"\d+")
+
+
 def clean_price(text: str) -> str:
     """
     Handles both  '329,99 ₼'  and  '1.899,99 ₼'  (dot = thousands sep).
     Returns a plain decimal string, e.g. '329.99' or '1899.99'.
     """
     # Strip currency symbols and whitespace
-    text = re.sub(r"[^\d,.]", "", text).strip()
+    text = text.translate(_PRICE_CHARS)
     # If there's a comma, dots are thousands separators → remove them
     if "," in text:
         text = text.replace(".", "").replace(",", ".")
@@ -87,21 +117,25 @@ def clean_price(text: str) -> str:
     return text
 
 
-def parse_products(html: str, page_num: int) -> list[dict]:
-    """Extract all product dicts from one page of HTML."""
-    soup = BeautifulSoup(html, "html.parser")
+def parse_products_tree(tree: LexborHTMLParser, page_num: int) -> list[dict]:
+    """Extract all product dicts from one parsed page."""
     products = []
 
-    for item in soup.select(".prodItem"):
+    for item in tree.css(SEL_CARD):
+        # .attributes builds a fresh dict on every access — read it once
+        attrs = item.attributes
+
         # ── GTM data (name, sku, brand, price, discount, category) ───────
-        gtm_raw = item.get("data-gtm", "{}")
+        # The card's own attributes carry most fields; the DOM below is
+        # only walked for what GTM lacks (current price, links, image).
+        gtm_raw = attrs.get("data-gtm") or "{}"
         try:
-            gtm = json.loads(gtm_raw)
+            gtm = json_loads(gtm_raw)
         except json.JSONDecodeError:
             gtm = {}
 
         name     = gtm.get("item_name", "").strip()
-        sku      = gtm.get("item_id", item.get("data-sku", "")).strip()
+        sku      = gtm.get("item_id", attrs.get("data-sku") or "").strip()
         brand    = gtm.get("item_brand", "").strip()
         category = gtm.get("item_category", "").strip()
         # GTM price is the OLD price, discount is the saving amount
@@ -109,47 +143,54 @@ def parse_products(html: str, page_num: int) -> list[dict]:
         discount_amount  = str(gtm.get("discount", "")).strip()
 
         # ── product ID (from element id attr) ─────────────────────────
-        product_id = item.get("id", "").strip()
+        product_id = (attrs.get("id") or "").strip()
 
         # ── fallback name from DOM ─────────────────────────────────────
         if not name:
-            title_el = item.select_one(".prodItem__title")
-            name = title_el.get_text(strip=True) if title_el else ""
+            title_el = item.css_first(SEL_TITLE)
+            name = title_el.text(strip=True) if title_el else ""
 
-        # ── prices from DOM ───────────────────────────────────────────
-        price_current = ""
+        # ── prices + installment label (e.g. "0% 6 ay") from DOM ─────
+        price_current = installment = ""
         price_old     = price_old_gtm
-        prices_el = item.select_one(".prodItem__prices")
+        inst_el   = None
+        prices_el = item.css_first(SEL_PRICES)
         if prices_el:
-            old_el = prices_el.select_one("i")
-            cur_el = prices_el.select_one("b")
+            old_el  = prices_el.css_first("i")
+            cur_el  = prices_el.css_first("b")
+            inst_el = prices_el.css_first("span")
             if old_el:
-                price_old = clean_price(old_el.get_text())
+                price_old = clean_price(old_el.text())
             if cur_el:
-                price_current = clean_price(cur_el.get_text())
+                price_current = clean_price(cur_el.text())
 
-        # ── installment label (e.g. "0% 6 ay") ───────────────────────
-        inst_el = item.select_one(".prodItem__prices span")
-        installment = inst_el.get_text(strip=True) if inst_el else ""
+        # a card may have several price blocks; the label can sit in a later one
+        if inst_el is None:
+            inst_el = item.css_first(SEL_INSTALL)
+        if inst_el:
+            installment = inst_el.text(strip=True)
 
         # ── URL ───────────────────────────────────────────────────────
         url = ""
-        img_link = item.select_one("a.prodItem__img[href]")
+        img_link = item.css_first(SEL_LINK)
         if img_link:
-            href = img_link.get("href", "")
+            href = img_link.attributes.get("href") or ""
             url = href if href.startswith("http") else BASE_URL + href
 
         # ── image (prefer webp source, fallback to img src) ───────────
         image_url = ""
-        pic = item.select_one("picture.product-image")
+        pic = item.css_first(SEL_PICTURE)
         if pic:
-            src_el = pic.select_one("source[srcset]")
+            src_el = pic.css_first(SEL_SOURCE)
             if src_el:
-                image_url = src_el.get("srcset", "").split(",")[0].strip()
+                # first candidate only — slice up to the comma, no list
+                srcset = src_el.attributes.get("srcset") or ""
+                comma  = srcset.find(",")
+                image_url = (srcset if comma < 0 else srcset[:comma]).strip()
         if not image_url:
-            img_el = item.select_one("img.product-image")
+            img_el = item.css_first(SEL_IMG)
             if img_el:
-                image_url = img_el.get("src", "")
+                image_url = img_el.attributes.get("src") or ""
 
         products.append({
             "name":            name,
@@ -169,14 +210,23 @@ def parse_products(html: str, page_num: int) -> list[dict]:
     return products
 
 
-def get_total_pages(html: str) -> int:
-    """Derive the last page number from the .pages pagination block."""
-    soup = BeautifulSoup(html, "html.parser")
+def parse_products(html: str, page_num: int) -> list[dict]:
+    """Extract all product dicts from one page of HTML."""
+    return parse_products_tree(LexborHTMLParser(html), page_num)
+
+
+def parse_page(html: str, page_num: int) -> tuple[list[dict], int]:
+    """Parse the first page once; return its products and the total page count."""
+    tree = LexborHTMLParser(html)
+    return parse_products_tree(tree, page_num), get_total_pages(tree)
 
+
+def get_total_pages(tree: LexborHTMLParser) -> int:
+    """Derive the last page number from the .pages pagination block."""
     # Collect all page numbers from links like ?p=N
     nums = []
-    for a in soup.select(".pages a.page[href]"):
-        m = re.search(r"[?&]p=(\d+)", a.get("href", ""))
+    for a in tree.css(SEL_PAGE_LINKS):
+        m = _PAGE_RE.search(a.attributes.get("href") or "")
         if m:
             nums.append(int(m.group(1)))
 
@@ -186,9 +236,9 @@ def get_total_pages(html: str) -> int:
         return last
 
     # Fallback: read total count from .catalog__count e.g. "(54)"
-    count_el = soup.select_one(".catalog__count")
+    count_el = tree.css_first(SEL_COUNT)
     if count_el:
-        m = re.search(r"\d+", count_el.get_text())
+        m = _NUM_RE.search(count_el.text())
         if m:
             total = int(m.group())
             # mgstore shows 20 products per page
@@ -199,59 +249,98 @@ def get_total_pages(html: str) -> int:
     return 1
 
 
+def add_unique(products: dict[str | int, dict], page_products: list[dict]) -> None:
+    """
+    Merge one page into `products`, keeping the first listing seen per sku
+    (falling back to url); listings with neither are all kept.
+    """
+    for p in page_products:
+        products.setdefault(p["sku"] or p["url"] or id(p), p)
+
+
 # ── async fetch ──────────────────────────────────────────────────────────────
 
+def make_resolver() -> aiohttp.abc.AbstractResolver:
+    """Non-blocking c-ares lookups when aiodns is installed, else getaddrinfo."""
+    try:
+        return aiohttp.AsyncResolver()
+    except RuntimeError:   # aiodns not installed
+        return aiohttp.ThreadedResolver()
+
+
 async def fetch_page(
     session: aiohttp.ClientSession,
     page: int,
     sem: asyncio.Semaphore,
+    limiter: RateLimiter,
 ) -> tuple[int, str]:
     """Fetch a single listing page; return (page_number, html)."""
     url = CATEGORY_URL if page == 1 else f"{CATEGORY_URL}?p={page}"
-    async with sem:
-        await asyncio.sleep(DELAY)
+    async with sem, limiter:
         async with session.get(url, headers=HEADERS, ssl=False) as resp:
             resp.raise_for_status()
-            html = await resp.text()
+            html = (await resp.read()).decode("utf-8", errors="replace")
             print(f"  Fetched page {page}  [status {resp.status}]")
             return page, html
 
 
+async def fetch_and_parse(
+    session: aiohttp.ClientSession,
+    page: int,
+    sem: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> tuple[int, list[dict]]:
+    """
+    Fetch one listing page and parse it on a worker thread. Lexbor releases
+    the GIL while building the tree, so the event loop keeps reading the
+    other in-flight responses meanwhile.
+    """
+    page, html = await fetch_page(session, page, sem, limiter)
+    return page, await asyncio.to_thread(parse_products, html, page)
+
+
 async def scrape_all() -> list[dict]:
     """Orchestrate fetching all pages concurrently and parsing products."""
-    sem = asyncio.Semaphore(CONCURRENCY)
-    all_products: list[dict] = []
-
-    connector = aiohttp.TCPConnector(ssl=False)
+    sem     = asyncio.Semaphore(CONCURRENCY)
+    limiter = RateLimiter(CONCURRENCY, DELAY)
+    all_products: dict[str | int, dict] = {}
+
+    # keep one warm connection per concurrent request and reuse it across pages
+    connector = aiohttp.TCPConnector(
+        limit=CONCURRENCY, limit_per_host=CONCURRENCY,
+        resolver=make_resolver(), use_dns_cache=True, ttl_dns_cache=600,
+        keepalive_timeout=60, ssl=False,
+    )
     timeout   = aiohttp.ClientTimeout(total=15, connect=8)
 
     try:
         async with aiohttp.ClientSession(
-            connector=connector, timeout=timeout
+            connector=connector, timeout=timeout, auto_decompress=True
         ) as session:
             # Step 1: fetch page 1 to discover total pages
             print("Fetching page 1 …")
-            _, html1 = await fetch_page(session, 1, asyncio.Semaphore(1))
-            total_pages = get_total_pages(html1)
-            prods1 = parse_products(html1, 1)
-            all_products.extend(prods1)
+            _, html1 = await fetch_page(session, 1, asyncio.Semaphore(1), limiter)
+            prods1, total_pages = parse_page(html1, 1)
+            add_unique(all_products, prods1)
             print(f"  Page 1: {len(prods1)} products")
 
             if total_pages < 2:
-                return all_products
+                return list(all_products.values())
 
             # Step 2: fetch remaining pages concurrently
             print(f"Fetching pages 2–{total_pages} (concurrency={CONCURRENCY}) …")
-            tasks = [fetch_page(session, p, sem) for p in range(2, total_pages + 1)]
+            tasks = [
+                fetch_and_parse(session, p, sem, limiter)
+                for p in range(2, total_pages + 1)
+            ]
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             for result in results:
                 if isinstance(result, Exception):
                     print(f"  [warn] page fetch error: {result}")
                     continue
-                page_num, html = result
-                prods = parse_products(html, page_num)
-                all_products.extend(prods)
+                page_num, prods = result
+                add_unique(all_products, prods)
                 print(f"  Page {page_num}: {len(prods)} products")
 
     except (aiohttp.ClientResponseError, aiohttp.ServerTimeoutError, asyncio.TimeoutError) as e:
@@ -265,59 +354,80 @@ async def scrape_all() -> list[dict]:
             return await scrape_all_cffi()
         raise
 
-    return all_products
+    return list(all_products.values())
 
 
 # ── curl_cffi fallback (Chrome TLS impersonation) ────────────────────────────
 
+# One curl_cffi session per run, created (and its cookies primed) on first
+# use so curl_cffi stays an optional import; main() closes it.
+_cffi_session = None
+
+
+def get_cffi_session():
+    """Return the run's shared curl_cffi AsyncSession, creating it if needed."""
+    global _cffi_session
+    if _cffi_session is None:
+        from curl_cffi.requests import AsyncSession
+        _cffi_session = AsyncSession(impersonate="chrome124", max_clients=CONCURRENCY)
+    return _cffi_session
+
+
+async def close_cffi_session() -> None:
+    global _cffi_session
+    if _cffi_session is not None:
+        await _cffi_session.close()
+        _cffi_session = None
+
+
 async def scrape_all_cffi() -> list[dict]:
     """Fallback: use curl_cffi async to bypass Cloudflare."""
-    from curl_cffi.requests import AsyncSession
-
-    all_products: list[dict] = []
-    sem = asyncio.Semaphore(CONCURRENCY)
+    all_products: dict[str | int, dict] = {}
+    sem     = asyncio.Semaphore(CONCURRENCY)
+    limiter = RateLimiter(CONCURRENCY, DELAY)
 
     async def fetch_cffi(s, page: int) -> tuple[int, str]:
         url = CATEGORY_URL if page == 1 else f"{CATEGORY_URL}?p={page}"
-        async with sem:
-            await asyncio.sleep(DELAY)
+        async with sem, limiter:
             resp = await s.get(url, headers=HEADERS)
             resp.raise_for_status()
             print(f"  [cffi] Fetched page {page}  [{resp.status_code}]")
-            return page, resp.text
+            return page, resp.content.decode("utf-8", errors="replace")
 
-    async with AsyncSession(impersonate="chrome124") as session:
-        await session.get(BASE_URL, headers=HEADERS)   # prime cookies
+    session = get_cffi_session()
+    await session.get(BASE_URL, headers=HEADERS)   # prime cookies
 
-        print("Fetching page 1 (cffi) …")
-        _, html1 = await fetch_cffi(session, 1)
-        total_pages = get_total_pages(html1)
-        prods1 = parse_products(html1, 1)
-        all_products.extend(prods1)
-        print(f"  Page 1: {len(prods1)} products")
+    print("Fetching page 1 (cffi) …")
+    _, html1 = await fetch_cffi(session, 1)
+    prods1, total_pages = parse_page(html1, 1)
+    add_unique(all_products, prods1)
+    print(f"  Page 1: {len(prods1)} products")
 
-        if total_pages >= 2:
-            tasks = [fetch_cffi(session, p) for p in range(2, total_pages + 1)]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"  [warn] {result}")
-                    continue
-                page_num, html = result
-                prods = parse_products(html, page_num)
-                all_products.extend(prods)
-                print(f"  Page {page_num}: {len(prods)} products")
+    if total_pages >= 2:
+        tasks = [fetch_cffi(session, p) for p in range(2, total_pages + 1)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"  [warn] {result}")
+                continue
+            page_num, html = result
+            prods = parse_products(html, page_num)
+            add_unique(all_products, prods)
+            print(f"  Page {page_num}: {len(prods)} products")
 
-    return all_products
+    return list(all_products.values())
 
 
 # ── CSV writer ────────────────────────────────────────────────────────────────
 
 def save_csv(products: list[dict], path: Path) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
+    # itemgetter pulls each row's fields in one C call, unlike DictWriter's
+    # per-field lookups
+    row = itemgetter(*CSV_FIELDS)
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(map(row, products))
     print(f"\nSaved {len(products)} products → {path}")
 
 
@@ -325,25 +435,17 @@ def save_csv(products: list[dict], path: Path) -> None:
 
 async def main() -> None:
     print(f"Scraping: {CATEGORY_URL}")
-    products = await scrape_all()
+    try:
+        products = await scrape_all()
+    finally:
+        await close_cffi_session()
 
     if not products:
         print("No products found — check selectors or connectivity.")
         return
 
-    # Deduplicate by sku (falling back to url)
-    seen: set[str] = set()
-    unique = []
-    for p in products:
-        key = p["sku"] or p["url"]
-        if key and key not in seen:
-            seen.add(key)
-            unique.append(p)
-        elif not key:
-            unique.append(p)
-
-    print(f"\nTotal unique products: {len(unique)}")
-    save_csv(unique, OUTPUT_CSV)
+    print(f"\nTotal unique products: {len(products)}")
+    save_csv(products, OUTPUT_CSV)
 
 
 if __name__ == "__main__":
@@ -21,16 +21,33 @@ Response: JSON  { html, hasMore, totalCount, loadedCount, availableFilters }
 
 Parallelisation: first batch gives totalCount → remaining offsets computed
 and fetched concurrently.
+
+Parsing: each html fragment is parsed with selectolax's Lexbor backend (a C
+parser, no BeautifulSoup) on a worker thread as soon as its batch lands.
 """
 
 import asyncio
 import csv
 import math
-import re
+from collections.abc import AsyncIterator, Awaitable, Iterator
+from contextlib import aclosing
+from dataclasses import dataclass
+from importlib.util import find_spec
+from operator import attrgetter
 from pathlib import Path
+from urllib.parse import urlencode
 
 import aiohttp
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+from _scrape_common import RateLimiter, _KeepChars
+
+# orjson decodes each batch's JSON straight from bytes, several times
+# faster than the stdlib; json.loads accepts bytes too, so both fit
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # ── paths ────────────────────────────────────────────────────────────────────
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,6 +63,17 @@ SECTION_ID  = "67"     # tablets
 LIMIT       = 15
 CONCURRENCY = 3
 DELAY       = 1.0
+RETRY_ON    = (429, 503)   # throttled / overloaded → back off and retry
+MAX_RETRIES = 3
+MAX_BACKOFF = 60.0         # cap on any single retry wait, Retry-After included
+
+# aiohttp only inflates br through brotli/brotlicffi; without either,
+# advertising br would let the server send a body we can't decode
+ACCEPT_ENCODING = (
+    "gzip, deflate, br"
+    if find_spec("brotli") or find_spec("brotlicffi")
+    else "gzip, deflate"
+)
 
 HEADERS = {
     "User-Agent": (
@@ -56,7 +84,7 @@ HEADERS = {
     "Accept": "application/json, text/javascript, */*; q=0.01",
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
     "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8,ru;q=0.7,az;q=0.6",
-    "Accept-Encoding": "gzip, deflate, br",   # zstd unsupported by aiohttp
+    "Accept-Encoding": ACCEPT_ENCODING,   # zstd unsupported by aiohttp
     "Origin": BASE_URL,
     "Referer": LISTING_URL,
     "X-Requested-With": "XMLHttpRequest",
@@ -89,284 +117,543 @@ CSV_FIELDS = [
 ]
 
 
+# ── CSS selectors (every markup assumption lives here) ───────────────────────
+SEL_CARD       = ".product-item"
+SEL_COMPARE    = "span.icon.compare[data-item-id]"
+SEL_LINK       = "a.prodTitle[href], a.thumbHolder[href]"
+SEL_IMG        = ".pic img"
+SEL_CATEGORY   = "a.prodSection"
+SEL_PRICE      = ".prodPrice"
+SEL_CREDIT     = ".creditPrice"
+SEL_DISC_PCT   = ".saleStar .percent"
+SEL_DISC_AMT   = ".saleStar .moneydif .amount"
+SEL_MONTHLY    = ".monthlyPayment[data-month]"
+SEL_AMOUNT     = ".amount"
+SEL_OUT_STOCK  = ".outofstock"
+SEL_OFFER      = ".specialOffers .offer .label"
+
+
+# ── product record ───────────────────────────────────────────────────────────
+
+@dataclass(slots=True)
+class Product:
+    """One listing, fields in CSV_FIELDS order (save_csv relies on it)."""
+    name:            str
+    product_id:      str
+    brand_id:        str
+    price_current:   str
+    price_old:       str
+    discount_pct:    str
+    discount_amount: str
+    installment_6m:  str
+    installment_12m: str
+    installment_18m: str
+    in_stock:        str
+    special_offer:   str
+    category:        str
+    url:             str
+    image_url:       str
+    offset:          int
+
+
 # ── helpers ──────────────────────────────────────────────────────────────────
 
+_PRICE_CHARS = _KeepChars(".")
+_PRICE_CHARS[ord(",")] = ord(".")   # decimal comma → point in the same pass
+
+
 def clean_price(text: str) -> str:
-    """'349.99 AZN' → '349.99'"""
-    return re.sub(r"[^\d.]", "", text.replace(",", ".")).strip()
+    """'349,99 AZN' → '349.99'"""
+    return text.translate(_PRICE_CHARS)
+
+
+# brand ids, categories and offer labels repeat across nearly every card;
+# keep one copy of each instead of a fresh str per product
+_INTERN: dict[str, str] = {}
 
 
-def parse_products(html: str, offset: int) -> list[dict]:
+def _i(s: str) -> str:
+    return _INTERN.setdefault(s, s)
+
+
+# challenge / block pages Cloudflare serves instead of the real response:
+# _cf_chl covers both window._cf_chl_opt and the __cf_chl_* form tokens
+_CF_MARKERS = (b"_cf_chl", b"cf-chl-bypass", b"cf-error-details")
+
+
+class CloudflareChallenge(Exception):
+    """A response body was a Cloudflare challenge page, not the site's."""
+
+
+def is_cf_challenge(raw: bytes) -> bool:
+    return any(marker in raw for marker in _CF_MARKERS)
+
+
+def decode_batch(raw: bytes) -> dict:
+    """Decode one AJAX response body; stray non-UTF-8 bytes become U+FFFD."""
+    try:
+        return json_loads(raw)
+    except ValueError:   # orjson and json both reject invalid UTF-8 outright
+        return json_loads(raw.decode("utf-8", errors="replace"))
+
+
+def parse_products(html: str, offset: int) -> list[Product]:
     """Parse all .product-item cards from one HTML fragment."""
-    soup = BeautifulSoup(html, "html.parser")
+    # an exhausted offset comes back with an empty fragment — skip the parser
+    if "product-item" not in html:
+        return []
+    tree = LexborHTMLParser(html)
     products = []
+    append   = products.append
 
-    for card in soup.select(".product-item"):
+    for card in tree.css(SEL_CARD):
         # ── data attributes ───────────────────────────────────────────
+        # node.attributes builds a fresh dict on every access — read it once
+        attrs = card.attributes
         product_id = ""
-        cmp = card.select_one("span.icon.compare[data-item-id]")
+        cmp = card.css_first(SEL_COMPARE)
         if cmp:
-            product_id = cmp.get("data-item-id", "").strip()
+            product_id = (cmp.attributes.get("data-item-id") or "").strip()
 
-        brand_id = card.get("data-brandid", "").strip()
-        name     = card.get("data-title", "").strip()
+        brand_id = _i((attrs.get("data-brandid") or "").strip())
+        name     = (attrs.get("data-title") or "").strip()
 
         # ── URL & image ───────────────────────────────────────────────
         url = ""
-        a_title = card.select_one("a.prodTitle[href], a.thumbHolder[href]")
+        a_title = card.css_first(SEL_LINK)
         if a_title:
-            href = a_title.get("href", "")
+            href = a_title.attributes.get("href") or ""
             url = href if href.startswith("http") else BASE_URL + href
 
         image_url = ""
-        img = card.select_one(".pic img")
+        img = card.css_first(SEL_IMG)
         if img:
-            src = img.get("src", "")
+            src = img.attributes.get("src") or ""
             image_url = src if src.startswith("http") else BASE_URL + src
 
         # ── category ──────────────────────────────────────────────────
         category = ""
-        cat_a = card.select_one("a.prodSection")
+        cat_a = card.css_first(SEL_CATEGORY)
         if cat_a:
-            category = cat_a.get_text(strip=True)
+            category = _i(cat_a.text(strip=True))
 
         # ── prices ────────────────────────────────────────────────────
         # .prodPrice: first span = current (cash), .creditPrice = old/credit
-        price_current = card.get("data-price", "")
+        price_current = attrs.get("data-price") or ""
         price_old     = ""
-        price_div = card.select_one(".prodPrice")
+        price_div = card.css_first(SEL_PRICE)
         if price_div:
-            credit_el = price_div.select_one(".creditPrice")
+            credit_el = price_div.css_first(SEL_CREDIT)
             if credit_el:
-                price_old = clean_price(credit_el.get_text())
+                price_old = clean_price(credit_el.text())
 
         # ── discount ──────────────────────────────────────────────────
         discount_pct    = ""
         discount_amount = ""
-        disc_pct_el = card.select_one(".saleStar .percent")
-        disc_amt_el = card.select_one(".saleStar .moneydif .amount")
-        if disc_pct_el:
-            discount_pct = disc_pct_el.get_text(strip=True)
-        if disc_amt_el:
-            discount_amount = disc_amt_el.get_text(strip=True)
+        # card-wide: a card can carry more than one .saleStar badge
+        if disc_pct_el := card.css_first(SEL_DISC_PCT):
+            discount_pct = _i(disc_pct_el.text(strip=True))
+        if disc_amt_el := card.css_first(SEL_DISC_AMT):
+            discount_amount = disc_amt_el.text(strip=True)
 
         # ── installment options ───────────────────────────────────────
+        # only the 6/12/18-month plans are kept — don't read the other amounts
         installments: dict[str, str] = {}
-        for mp in card.select(".monthlyPayment[data-month]"):
-            month = mp.get("data-month", "")
-            amt_el = mp.select_one(".amount")
-            if month and amt_el:
-                installments[month] = amt_el.get_text(strip=True)
+        for mp in card.css(SEL_MONTHLY):
+            month = mp.attributes.get("data-month") or ""
+            if month in ("6", "12", "18") and (amt_el := mp.css_first(SEL_AMOUNT)):
+                installments[month] = amt_el.text(strip=True)
 
         # ── stock status ──────────────────────────────────────────────
-        in_stock = "False" if card.select_one(".outofstock") else "True"
+        in_stock = "False" if card.css_first(SEL_OUT_STOCK) else "True"
 
         # ── special offers ────────────────────────────────────────────
-        offers = [
-            el.get_text(strip=True)
-            for el in card.select(".specialOffers .offer .label")
-            if el.get_text(strip=True)
-        ]
-        special_offer = "; ".join(offers)
-
-        products.append({
-            "name":            name,
-            "product_id":      product_id,
-            "brand_id":        brand_id,
-            "price_current":   price_current,
-            "price_old":       price_old,
-            "discount_pct":    discount_pct,
-            "discount_amount": discount_amount,
-            "installment_6m":  installments.get("6", ""),
-            "installment_12m": installments.get("12", ""),
-            "installment_18m": installments.get("18", ""),
-            "in_stock":        in_stock,
-            "special_offer":   special_offer,
-            "category":        category,
-            "url":             url,
-            "image_url":       image_url,
-            "offset":          offset,
-        })
+        special_offer = _i("; ".join(
+            label for el in card.css(SEL_OFFER) if (label := el.text(strip=True))
+        ))
+
+        append(Product(
+            name            = name,
+            product_id      = product_id,
+            brand_id        = brand_id,
+            price_current   = price_current,
+            price_old       = price_old,
+            discount_pct    = discount_pct,
+            discount_amount = discount_amount,
+            installment_6m  = installments.get("6", ""),
+            installment_12m = installments.get("12", ""),
+            installment_18m = installments.get("18", ""),
+            in_stock        = in_stock,
+            special_offer   = special_offer,
+            category        = category,
+            url             = url,
+            image_url       = image_url,
+            offset          = offset,
+        ))
 
     return products
 
 
-def build_payload(offset: int) -> dict:
-    return {
-        "action":    "loadProducts",
-        "sectionID": SECTION_ID,
-        "brandID":   "0",
-        "offset":    str(offset),
-        "limit":     str(LIMIT),
-        "sorting":   "",
-    }
+# everything but the offset is fixed for a run — urlencode it once
+_PAYLOAD_BASE = {
+    "action":    "loadProducts",
+    "sectionID": SECTION_ID,
+    "brandID":   "0",
+    "limit":     str(LIMIT),
+    "sorting":   "",
+}
+_PAYLOAD_PREFIX = urlencode(_PAYLOAD_BASE)
+
+
+def build_payload(offset: int) -> bytes:
+    """Form-encoded POST body (Content-Type comes from HEADERS)."""
+    return f"{_PAYLOAD_PREFIX}&offset={offset}".encode()
+
+
+def add_unique(seen: set[str], batch: list[Product]) -> Iterator[Product]:
+    """
+    Yield the products from `batch` not written yet, keyed by product_id
+    (falling back to url); keys are recorded in `seen`. Listings with neither
+    are all kept.
+    """
+    for p in batch:
+        key = p.product_id or p.url
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        yield p
+
+
+# ── rate limiting ─────────────────────────────────────────────────────────────
+
+def backoff_delay(attempt: int, retry_after: str | None) -> float:
+    """
+    Retry-After when the server gives seconds, else DELAY · 2^attempt —
+    either way capped at MAX_BACKOFF so one header can't stall the run.
+    """
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF)
+    return min(DELAY * 2 ** attempt, MAX_BACKOFF)
 
 
 # ── async fetch ──────────────────────────────────────────────────────────────
 
+_session: aiohttp.ClientSession | None = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared aiohttp session, creating it on first use. Its
+    connector keeps one warm connection per concurrent request, so priming,
+    batch 0 and every later batch reuse the same TLS connections.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONCURRENCY, limit_per_host=CONCURRENCY,
+            use_dns_cache=True, ttl_dns_cache=300,
+            keepalive_timeout=75, ssl=False,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=20, connect=8),
+            auto_decompress=True,
+        )
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def prime_session(session: aiohttp.ClientSession) -> None:
+    """
+    GET the listing page so the session picks up the site's cookies. The
+    cookies are a nicety, so a timeout, connection error or error status
+    here is only a warning — batch 0 decides whether the aiohttp path works. Only a
+    Cloudflare challenge is raised.
+    """
+    try:
+        async with session.get(
+            LISTING_URL,
+            headers={**HEADERS, "Accept": "text/html,*/*",
+                     "Content-Type": "text/html"},
+            ssl=False,
+        ) as r:
+            raw = await r.read()
+    except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+        print(f"  [warn] listing page failed ({type(e).__name__}) — "
+              "continuing without priming")
+        return
+    if is_cf_challenge(raw):
+        raise CloudflareChallenge(f"listing page [{r.status}]")
+    if not r.ok:
+        print(f"  [warn] listing page returned {r.status} — continuing without priming")
+
+
+async def with_prime(
+    prime: Awaitable, batch0: Awaitable[tuple[int, dict]]
+) -> tuple[int, dict]:
+    """
+    Run the priming GET and the offset-0 POST concurrently and return the
+    POST's result. Both always finish before this returns; a Cloudflare
+    challenge from either wins over any other error, so it always reaches
+    the curl_cffi fallback.
+    """
+    results = await asyncio.gather(prime, batch0, return_exceptions=True)
+    errors  = [r for r in results if isinstance(r, BaseException)]
+    for err in errors:
+        if isinstance(err, CloudflareChallenge):
+            raise err
+    if errors:
+        raise errors[0]
+    return results[1]
+
+
 async def fetch_batch(
     session: aiohttp.ClientSession,
     offset: int,
     sem: asyncio.Semaphore,
+    limiter: RateLimiter,
 ) -> tuple[int, dict]:
-    """POST one batch; return (offset, parsed_json)."""
-    async with sem:
-        await asyncio.sleep(DELAY)
-        async with session.post(
-            AJAX_URL,
-            data=build_payload(offset),
-            headers=HEADERS,
-            ssl=False,
-        ) as resp:
-            resp.raise_for_status()
-            raw = await resp.read()
-            import json as _json
-            data = _json.loads(raw.decode("utf-8", errors="replace"))
-            print(f"  offset={offset:3d}  loaded={data.get('loadedCount')}  "
-                  f"hasMore={data.get('hasMore')}")
-            return offset, data
+    """
+    POST one batch; return (offset, parsed_json). 429/503 responses and
+    timeouts are retried with backoff; a Cloudflare challenge body raises
+    CloudflareChallenge straight away. The semaphore is held per attempt,
+    not across the backoff sleep, so a throttled batch doesn't block the
+    others from going out.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with sem, limiter, session.post(
+                AJAX_URL,
+                data=build_payload(offset),
+                headers=HEADERS,
+                ssl=False,
+            ) as resp:
+                raw = await resp.read()
+        except asyncio.TimeoutError:
+            if attempt == MAX_RETRIES:
+                raise
+            status, wait = "timeout", backoff_delay(attempt, None)
+        else:
+            if is_cf_challenge(raw):
+                raise CloudflareChallenge(f"offset={offset} [{resp.status}]")
+            if resp.status not in RETRY_ON or attempt == MAX_RETRIES:
+                resp.raise_for_status()
+                data = decode_batch(raw)
+                print(f"  offset={offset:3d}  loaded={data.get('loadedCount')}  "
+                      f"hasMore={data.get('hasMore')}")
+                return offset, data
+            status = resp.status
+            wait   = backoff_delay(attempt, resp.headers.get("Retry-After"))
+        print(f"  [{status}] offset={offset} — retrying in {wait:.1f}s")
+        await asyncio.sleep(wait)
+
+
+async def fetch_and_parse(
+    session: aiohttp.ClientSession,
+    offset: int,
+    sem: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> tuple[int, list[Product]]:
+    """
+    Fetch one batch and parse its fragment on a worker thread. Lexbor
+    releases the GIL while building the tree, so the event loop keeps
+    reading the other in-flight responses meanwhile.
+    """
+    offset, data = await fetch_batch(session, offset, sem, limiter)
+    return offset, await asyncio.to_thread(parse_products, data["html"], offset)
+
+
+async def scrape_batches() -> AsyncIterator[list[Product]]:
+    """
+    Yield each batch's products in offset order: batch 0 first, then the
+    remaining offsets, fetched concurrently, each yielded as soon as it and
+    every earlier batch have landed.
+    """
+    sem     = asyncio.Semaphore(CONCURRENCY)
+    limiter = RateLimiter(CONCURRENCY, DELAY)
 
+    try:
+        session = get_session()
 
-async def scrape_all() -> list[dict]:
-    """Fetch batch 0 first, then all remaining offsets concurrently."""
-    sem = asyncio.Semaphore(CONCURRENCY)
-    all_products: list[dict] = []
+        # Batch 0 discovers totalCount; the cookie-priming GET rides
+        # alongside it instead of costing a round trip of its own
+        print("Fetching offset=0 …")
+        _, data0 = await with_prime(
+            prime_session(session),
+            fetch_batch(session, 0, asyncio.Semaphore(1), limiter),
+        )
+        yield parse_products(data0["html"], 0)
 
-    connector = aiohttp.TCPConnector(ssl=False)
-    timeout   = aiohttp.ClientTimeout(total=20, connect=8)
+        total_count  = int(data0.get("totalCount", 0))
+        loaded_count = int(data0.get("loadedCount", LIMIT))
+        print(f"  totalCount={total_count}, first batch={loaded_count}")
 
-    try:
-        async with aiohttp.ClientSession(
-            connector=connector, timeout=timeout
-        ) as session:
-            # Prime session cookies
-            async with session.get(
-                LISTING_URL,
-                headers={**HEADERS, "Accept": "text/html,*/*",
-                         "Content-Type": "text/html"},
-                ssl=False,
-            ) as r:
-                r.raise_for_status()
-
-            # Batch 0: discover totalCount
-            print("Fetching offset=0 …")
-            _, data0 = await fetch_batch(session, 0, asyncio.Semaphore(1))
-            prods0 = parse_products(data0["html"], 0)
-            all_products.extend(prods0)
-
-            total_count  = int(data0.get("totalCount", 0))
-            loaded_count = int(data0.get("loadedCount", LIMIT))
-            print(f"  totalCount={total_count}, first batch={loaded_count}")
-
-            if not data0.get("hasMore") or total_count <= loaded_count:
-                return all_products
-
-            # Compute remaining offsets and fetch concurrently
-            remaining_offsets = list(range(loaded_count, total_count, LIMIT))
-            print(f"Fetching offsets {remaining_offsets} (concurrency={CONCURRENCY}) …")
-
-            tasks = [fetch_batch(session, off, sem) for off in remaining_offsets]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in sorted(
-                [r for r in results if not isinstance(r, Exception)],
-                key=lambda x: x[0],
-            ):
-                off, data = result
-                prods = parse_products(data["html"], off)
-                all_products.extend(prods)
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"  [warn] {result}")
-
-    except (aiohttp.ClientResponseError, aiohttp.ServerTimeoutError, asyncio.TimeoutError) as e:
-        status = getattr(e, "status", None)
-        if status == 403 or status is None:
-            reason = f"[{status}]" if status else "[timeout/connection error]"
-            print(f"\n  {reason} Cloudflare — falling back to curl_cffi …\n")
-            return await scrape_all_cffi()
-        raise
-
-    return all_products
+        if not data0.get("hasMore") or total_count <= loaded_count:
+            return
+
+        # Compute remaining offsets and fetch concurrently
+        remaining_offsets = list(range(loaded_count, total_count, LIMIT))
+        print(f"Fetching offsets {remaining_offsets} (concurrency={CONCURRENCY}) …")
+
+        # each batch is parsed as soon as it lands; awaiting the tasks in
+        # list order hands them on in offset order
+        tasks = [
+            asyncio.create_task(fetch_and_parse(session, off, sem, limiter))
+            for off in remaining_offsets
+        ]
+        try:
+            for task in tasks:
+                try:
+                    _, prods = await task
+                except Exception as e:
+                    print(f"  [warn] {e}")
+                    continue
+                yield prods
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    except (CloudflareChallenge, asyncio.TimeoutError) as e:
+        # timeouts only get here once fetch_batch has retried them, i.e. the
+        # connection is being dropped persistently rather than by a blip
+        reason = f"[{e}]" if isinstance(e, CloudflareChallenge) else "[timeout]"
+        print(f"\n  {reason} Cloudflare — falling back to curl_cffi …\n")
+        async with aclosing(scrape_batches_cffi()) as batches:
+            async for prods in batches:
+                yield prods
 
 
 # ── curl_cffi fallback ────────────────────────────────────────────────────────
 
-async def scrape_all_cffi() -> list[dict]:
-    """Fallback: curl_cffi async."""
-    from curl_cffi.requests import AsyncSession
+_cffi_session = None
 
-    sem = asyncio.Semaphore(CONCURRENCY)
-    all_products: list[dict] = []
 
-    async def fetch_cffi(s, offset: int) -> tuple[int, dict]:
-        async with sem:
-            await asyncio.sleep(DELAY)
-            resp = await s.post(AJAX_URL, data=build_payload(offset), headers=HEADERS)
-            resp.raise_for_status()
-            data = resp.json()
-            print(f"  [cffi] offset={offset}  loaded={data.get('loadedCount')}")
-            return offset, data
-
-    async with AsyncSession(impersonate="chrome124") as s:
-        await s.get(LISTING_URL, headers={**HEADERS, "Accept": "text/html,*/*"})
-
-        _, data0 = await fetch_cffi(s, 0)
-        all_products.extend(parse_products(data0["html"], 0))
-        total_count  = int(data0.get("totalCount", 0))
-        loaded_count = int(data0.get("loadedCount", LIMIT))
-        print(f"  totalCount={total_count}, first batch={loaded_count}")
+def get_cffi_session():
+    """Return the run's shared curl_cffi AsyncSession, creating it if needed."""
+    global _cffi_session
+    if _cffi_session is None:
+        from curl_cffi.requests import AsyncSession
+        _cffi_session = AsyncSession(impersonate="chrome124", max_clients=CONCURRENCY)
+    return _cffi_session
 
-        if data0.get("hasMore") and total_count > loaded_count:
-            remaining = list(range(loaded_count, total_count, LIMIT))
-            tasks   = [fetch_cffi(s, off) for off in remaining]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for result in sorted(
-                [r for r in results if not isinstance(r, Exception)],
-                key=lambda x: x[0],
-            ):
-                off, data = result
-                all_products.extend(parse_products(data["html"], off))
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"  [warn] {result}")
 
-    return all_products
+async def close_cffi_session() -> None:
+    global _cffi_session
+    if _cffi_session is not None:
+        await _cffi_session.close()
+        _cffi_session = None
+
+
+async def scrape_batches_cffi() -> AsyncIterator[list[Product]]:
+    """Fallback: curl_cffi async."""
+    sem     = asyncio.Semaphore(CONCURRENCY)
+    limiter = RateLimiter(CONCURRENCY, DELAY)
+
+    async def fetch_cffi(s, offset: int) -> tuple[int, dict]:
+        for attempt in range(MAX_RETRIES + 1):
+            async with sem, limiter:
+                resp = await s.post(AJAX_URL, data=build_payload(offset), headers=HEADERS)
+            if is_cf_challenge(resp.content):
+                raise CloudflareChallenge(f"[cffi] offset={offset} [{resp.status_code}]")
+            if resp.status_code not in RETRY_ON or attempt == MAX_RETRIES:
+                resp.raise_for_status()
+                data = decode_batch(resp.content)
+                print(f"  [cffi] offset={offset}  loaded={data.get('loadedCount')}")
+                return offset, data
+            wait = backoff_delay(attempt, resp.headers.get("Retry-After"))
+            print(f"  [cffi] [{resp.status_code}] offset={offset} — "
+                  f"retrying in {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    async def fetch_and_parse_cffi(s, offset: int) -> tuple[int, list[Product]]:
+        offset, data = await fetch_cffi(s, offset)
+        return offset, await asyncio.to_thread(parse_products, data["html"], offset)
+
+    s = get_cffi_session()
+    _, data0 = await with_prime(
+        s.get(LISTING_URL, headers={**HEADERS, "Accept": "text/html,*/*"}),
+        fetch_cffi(s, 0),
+    )
+    yield parse_products(data0["html"], 0)
+    total_count  = int(data0.get("totalCount", 0))
+    loaded_count = int(data0.get("loadedCount", LIMIT))
+    print(f"  totalCount={total_count}, first batch={loaded_count}")
+
+    if data0.get("hasMore") and total_count > loaded_count:
+        remaining = list(range(loaded_count, total_count, LIMIT))
+        tasks = [
+            asyncio.create_task(fetch_and_parse_cffi(s, off))
+            for off in remaining
+        ]
+        try:
+            for task in tasks:
+                try:
+                    _, prods = await task
+                except Exception as e:
+                    print(f"  [warn] {e}")
+                    continue
+                yield prods
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
 
 # ── CSV writer ────────────────────────────────────────────────────────────────
 
-def save_csv(products: list[dict], path: Path) -> None:
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} products → {path}")
+async def save_csv(batches: AsyncIterator[list[Product]], path: Path) -> int:
+    """
+    Stream batches to `path` as they arrive, skipping products already
+    written (by product_id, falling back to url). Rows go to a sibling
+    .part file that only replaces `path` once something was written, so a
+    failed run leaves the previous CSV intact. Returns the row count.
+    """
+    # attrgetter pulls each row's fields in one C call; dataclasses.astuple
+    # would deep-copy every field on the way
+    row  = attrgetter(*CSV_FIELDS)
+    tmp  = path.with_suffix(".part")
+    seen: set[str] = set()
+    count = 0
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            writerow = csv.writer(f).writerow
+            writerow(CSV_FIELDS)
+            async with aclosing(batches):
+                async for prods in batches:
+                    for p in add_unique(seen, prods):
+                        writerow(row(p))
+                        count += 1
+        if count:
+            tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return count
 
 
 # ── entry point ───────────────────────────────────────────────────────────────
 
 async def main() -> None:
     print(f"Scraping: {LISTING_URL}")
-    products = await scrape_all()
+    try:
+        count = await save_csv(scrape_batches(), OUTPUT_CSV)
+    finally:
+        await close_session()
+        await close_cffi_session()
 
-    if not products:
+    if not count:
         print("No products found — check selectors or connectivity.")
         return
 
-    # Deduplicate by product_id (falling back to url)
-    seen: set[str] = set()
-    unique = []
-    for p in products:
-        key = p["product_id"] or p["url"]
-        if key and key not in seen:
-            seen.add(key)
-            unique.append(p)
-        elif not key:
-            unique.append(p)
-
-    print(f"\nTotal unique products: {len(unique)}")
-    save_csv(unique, OUTPUT_CSV)
+    print(f"\nTotal unique products: {count}")
+    print(f"\nSaved {count} products → {OUTPUT_CSV}")
 
 
 if __name__ == "__main__":
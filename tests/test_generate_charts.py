@@ -0,0 +1,17 @@
+import generate_charts
+
+CSV = (
+    ",".join(generate_charts.LOAD_COLS) + "\n"
+    + "irshad.az,Tab A,1.299.99" + "," * (len(generate_charts.LOAD_COLS) - 3) + "\n"
+    + "irshad.az,Tab B,499.99" + "," * (len(generate_charts.LOAD_COLS) - 3) + "\n"
+)
+
+
+def test_malformed_price_is_invalid_not_fatal(tmp_path, monkeypatch):
+    data = tmp_path / "data.csv"
+    data.write_text(CSV)
+    monkeypatch.setattr(generate_charts, "DATA_FILE", data)
+    df = generate_charts.parse_csv()
+    assert df["price_current"].isna().tolist() == [True, False]
+    assert df["price_valid"].tolist() == [False, True]
+    assert df["price_current"].dtype == "float32"
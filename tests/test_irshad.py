@@ -0,0 +1,19 @@
+import irshad
+
+VALUELESS_CARD = """
+<div class="product">
+  <a class="product__name product-link" href>Tab Z</a>
+  <div class="product__img"><img src></div>
+</div>
+"""
+
+
+def test_valueless_attributes_parse_as_empty():
+    [p], _ = irshad.parse_page(VALUELESS_CARD, 1)
+    assert p["name"] == "Tab Z"
+    assert p["url"] == ""
+    assert p["image_url"] == ""
+
+
+def test_valueless_csrf_token_is_empty():
+    assert irshad.get_csrf_token(b'<head><meta name="csrf-token" content></head>') == ""
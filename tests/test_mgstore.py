@@ -0,0 +1,32 @@
+import mgstore
+
+VALUELESS_CARD = """
+<div class="prodItem" data-gtm id data-sku>
+  <div class="prodItem__title">Tab Y</div>
+  <a class="prodItem__img" href></a>
+  <img class="product-image" src>
+</div>
+"""
+
+
+def test_valueless_attributes_parse_as_empty():
+    [p] = mgstore.parse_products(VALUELESS_CARD, 1)
+    assert p["name"] == "Tab Y"
+    assert p["product_id"] == ""
+    assert p["url"] == mgstore.BASE_URL
+    assert p["image_url"] == ""
+
+
+TWO_PRICE_BLOCK_CARD = """
+<div class="prodItem" data-gtm='{"item_id": "T1"}'>
+  <div class="prodItem__title">Tab I</div>
+  <div class="prodItem__prices"><b>500 ₼</b></div>
+  <div class="prodItem__prices"><span>0% 6 ay</span></div>
+</div>
+"""
+
+
+def test_installment_found_past_first_price_block():
+    [p] = mgstore.parse_products(TWO_PRICE_BLOCK_CARD, 1)
+    assert p["price_current"] == "500"
+    assert p["installment"] == "0% 6 ay"
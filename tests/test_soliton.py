@@ -0,0 +1,36 @@
+import soliton
+
+VALUELESS_CARD = """
+<div class="product-item" data-title="Tab X" data-brandid="7" data-price>
+  <span class="icon compare" data-item-id></span>
+  <a class="prodTitle" href>Tab X</a>
+  <div class="pic"><img src></div>
+  <div class="monthlyPayment" data-month><span class="amount">9</span></div>
+</div>
+"""
+
+
+def test_valueless_attributes_parse_as_empty():
+    [p] = soliton.parse_products(VALUELESS_CARD, 0)
+    assert p.name == "Tab X"
+    assert p.product_id == ""
+    assert p.price_current == ""
+    assert p.url == soliton.BASE_URL
+    assert p.image_url == soliton.BASE_URL
+    assert p.installment_6m == ""
+
+
+TWO_BADGE_CARD = """
+<div class="product-item" data-title="Tab D" data-brandid="7" data-price="500">
+  <a class="prodTitle" href="/tab-d">Tab D</a>
+  <div class="saleStar new"></div>
+  <div class="saleStar"><span class="percent">-10%</span>
+    <span class="moneydif"><span class="amount">50</span></span></div>
+</div>
+"""
+
+
+def test_discount_found_past_first_sale_badge():
+    [p] = soliton.parse_products(TWO_BADGE_CARD, 0)
+    assert p.discount_pct == "-10%"
+    assert p.discount_amount == "50"